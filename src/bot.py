@@ -1,9 +1,27 @@
+import asyncio
+import contextvars
 import logging
-import os
+import signal
+import time
 from telegram import Update
-from telegram.ext import Application, CommandHandler, CallbackQueryHandler, ContextTypes
+from telegram.ext import (
+    Application, ApplicationHandlerStop, CommandHandler, CallbackQueryHandler, ContextTypes, TypeHandler
+)
 from dotenv import load_dotenv
 from handler.button_handlers import ButtonHandlers
+from handler.admin_handlers import AdminHandlers
+from handler.rate_limit import InboundLimiter
+from monitoring.tracing import Tracer, TracingRequest
+from jobs.scheduler import Scheduler
+from jobs.tasks import for_each_schema, register_default_jobs, warm_up
+from monitoring.health import HealthServer
+from monitoring.memory import MemoryDiagnostics
+from model.ad_catalog import AdCatalog, AdCatalogListener
+from model.ad_rotation import AdRotation
+from model.database import DatabaseConnection
+from model.idempotency import IdempotencyStore
+from model.tenancy import TENANTS, Tenant, set_current_tenant
+from monitoring.metrics import Metrics
 
 logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -11,15 +29,66 @@ logging.basicConfig(
 )
 
 load_dotenv()
-TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
+
+# 현재 update 처리 시작 시각 (tenant 별 처리 시간 측정용)
+_update_started = contextvars.ContextVar('update_started', default=None)
 
 async def error_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     logging.error(f"Update {update} caused error {context.error}")
 
-def main():
-    handlers = ButtonHandlers()
+def register_memory_caches(handlers: ButtonHandlers):
+    """Registers the bot's in-process caches for memory reports."""
+    memory = MemoryDiagnostics()
+    memory.register_cache('language_cache', lambda: handlers.language_cache)
+    memory.register_cache('viewed_today', lambda: handlers.viewed_today)
+    memory.register_cache('ad_catalog', lambda: AdCatalog()._catalogs)
+    memory.register_cache('ad_rotation', lambda: AdRotation()._state)
+    memory.register_cache('read_your_writes_pins', lambda: DatabaseConnection()._pinned)
+    memory.register_cache('rate_limit_buckets', lambda: InboundLimiter().buckets)
+    memory.register_cache('idempotency_keys', lambda: IdempotencyStore()._keys)
+
+def build_application(tenant: Tenant, handlers: ButtonHandlers, admin_handlers: AdminHandlers) -> Application:
+    """
+    Builds the Application for one tenant's bot token.
+    
+    All tenants share the handlers, caches, database connection pool and scheduler;
+    a first handler group marks each update with its tenant, counts it and
+    drops it if the inbound limiter refuses it.
     
-    application = Application.builder().token(TOKEN).build()
+    Args:
+        tenant (Tenant): The tenant to serve
+        handlers (ButtonHandlers): Shared button handlers
+        admin_handlers (AdminHandlers): Shared admin handlers
+        
+    Returns:
+        Application: The configured application
+    """
+    builder = Application.builder().token(tenant.token)
+    if Tracer().enabled:
+        # Bot API 호출을 span으로 기록 (HTTPXRequest 기본값은 연결 1개이므로 builder 기본값 256 으로 맞춤)
+        builder = builder.request(TracingRequest(connection_pool_size=256))
+    application = builder.build()
+    application.bot_data['tenant'] = tenant
+    metrics = Metrics()
+    limiter = InboundLimiter()
+    limiter.register_queue(application.update_queue)
+
+    async def enter_tenant(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        set_current_tenant(tenant)
+        _update_started.set(time.perf_counter())
+        metrics.incr(f"tenant.{tenant.name}.updates")
+        # 제한을 넘은 update 는 DB 에 닿기 전에 버림
+        if not await limiter.admit(update, handlers):
+            raise ApplicationHandlerStop
+
+    async def leave_tenant(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        limiter.release()
+        started = _update_started.get()
+        if started is not None:
+            metrics.observe(f"tenant.{tenant.name}.update_ms", (time.perf_counter() - started) * 1000)
+
+    application.add_handler(TypeHandler(Update, enter_tenant), group=-1)
+    application.add_handler(TypeHandler(Update, leave_tenant), group=1)
 
     application.add_handler(CommandHandler("start", handlers.start_handler))
     application.add_handler(CommandHandler("menu", handlers.menu_handler))
@@ -29,14 +98,70 @@ def main():
     application.add_handler(CommandHandler("ads", handlers._handle_ad_action))
     application.add_handler(CommandHandler("ad", handlers._handle_ad_action))
     application.add_handler(CommandHandler("language", handlers._handle_language_action))
+    application.add_handler(CommandHandler("adstats", admin_handlers.ad_stats_handler))
+    application.add_handler(CommandHandler("memstats", admin_handlers.memory_stats_handler))
+    application.add_handler(CommandHandler("adadmin", admin_handlers.ad_admin_handler))
     
     application.add_handler(CallbackQueryHandler(handlers.claim_val_callback, pattern="^claim_val_"))
     application.add_handler(CallbackQueryHandler(handlers.menu_callback, pattern="^menu_"))
     application.add_handler(CallbackQueryHandler(handlers.language_callback, pattern="^lang_"))
     
     application.add_error_handler(error_handler)
+    return application
+
+async def run_bots(applications: list, handlers: ButtonHandlers, scheduler: Scheduler):
+    """
+    Runs all tenant applications on one event loop until SIGINT/SIGTERM.
+    
+    Caches are warmed before any bot starts polling (ready after that). The
+    warm-up queries run in a worker thread so /health keeps answering.
+    """
+    health = HealthServer()
+    await health.start()
+    await asyncio.to_thread(warm_up, handlers)
+    ad_listener = AdCatalogListener(AdCatalog())
+    await ad_listener.start()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            pass
+
+    started = []
+    try:
+        for application in applications:
+            await application.initialize()
+            await application.start()
+            await application.updater.start_polling()
+            started.append(application)
+            logging.info(f"Bot for tenant {application.bot_data['tenant'].name} started")
+        scheduler.start()
+        await stop.wait()
+    finally:
+        await scheduler.stop()
+        await ad_listener.stop()
+        for application in reversed(started):
+            await application.updater.stop()
+            await application.stop()
+            await application.shutdown()
+        await health.stop()
+        # 마지막 flush 이후 바뀐 광고 로테이션 상태 저장
+        await for_each_schema(AdRotation().flush)()
+        DatabaseConnection().close()
+
+def main():
+    MemoryDiagnostics().start()
+    handlers = ButtonHandlers()
+    admin_handlers = AdminHandlers(handlers)
+    register_memory_caches(handlers)
+    scheduler = Scheduler()
+    register_default_jobs(scheduler, handlers)
 
-    application.run_polling()
+    applications = [build_application(tenant, handlers, admin_handlers) for tenant in TENANTS]
+    asyncio.run(run_bots(applications, handlers, scheduler))
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    main()
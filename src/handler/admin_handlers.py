@@ -0,0 +1,173 @@
+import logging
+import os
+from telegram import Update
+from telegram.ext import ContextTypes
+from dotenv import load_dotenv
+from handler.deadlines import with_deadline
+from model.ad_management import create_ad, list_ads, update_ad
+from model.rollups import get_ad_stats
+from monitoring.memory import MemoryDiagnostics
+from monitoring.tracing import traced
+
+load_dotenv()
+
+
+class AdminHandlers:
+    """
+    Handles admin-only commands.
+    Admins are the Telegram user ids listed in ADMIN_USER_IDS (comma separated).
+    """
+
+    def __init__(self, handlers):
+        """
+        Initialize the AdminHandlers.
+
+        Args:
+            handlers (ButtonHandlers): Used for language-aware texts
+        """
+        self.handlers = handlers
+        self.admin_ids = {
+            int(user_id) for user_id in os.getenv('ADMIN_USER_IDS', '').split(',') if user_id.strip()
+        }
+
+    def is_admin(self, user_id: int) -> bool:
+        return user_id in self.admin_ids
+
+    async def _reject_non_admin(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
+        """Replies with a refusal and returns True if the sender is not an admin."""
+        if self.is_admin(update.effective_user.id):
+            return False
+        chat = update.effective_chat
+        messages = self.handlers.get_text(chat.type, chat.id, 'ADMIN_MESSAGES')
+        await context.bot.send_message(chat_id=chat.id, text=messages['not_admin'])
+        return True
+
+    @traced
+    @with_deadline
+    async def ad_stats_handler(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """
+        Handles /adstats [days]: per-ad impressions and points from the daily rollup,
+        with the days not folded yet counted live from ad_view_logs.
+
+        Args:
+            update (Update): The update object containing the message information
+            context (ContextTypes.DEFAULT_TYPE): The context object for the current update
+        """
+        if await self._reject_non_admin(update, context):
+            return
+
+        chat_type = update.effective_chat.type
+        chat_id = update.effective_chat.id
+        messages = self.handlers.get_text(chat_type, chat_id, 'ADMIN_MESSAGES')
+        try:
+            days = int(context.args[0]) if context.args else 7
+        except ValueError:
+            days = 7
+        days = min(max(days, 1), 366)
+
+        try:
+            rows = get_ad_stats(days)
+            if not rows:
+                text = messages['stats_empty'].format(days=days)
+            else:
+                lines = [messages['stats_header'].format(days=days)]
+                for row in rows:
+                    lines.append(messages['stats_row'].format(
+                        ad_id=row['ad_id'],
+                        impressions=row['impressions'] or 0,
+                        user_impressions=row['user_impressions'] or 0,
+                        group_impressions=row['group_impressions'] or 0,
+                        points_awarded=row['points_awarded'] or 0
+                    ))
+                text = '\n'.join(lines)
+            await context.bot.send_message(chat_id=chat_id, text=text)
+        except Exception as e:
+            logging.error(f"Error in ad_stats_handler: {e}", exc_info=True)
+            await context.bot.send_message(chat_id=chat_id, text=messages['stats_error'])
+
+    def _run_ad_command(self, args: list, messages: dict) -> str:
+        """
+        Runs one /adadmin subcommand and returns the reply text.
+
+        Raises ValueError (shown to the admin) for invalid arguments.
+        """
+        command = args[0].lower() if args else ''
+        if command == 'list':
+            ads = list_ads()
+            if not ads:
+                return messages['ad_list_empty']
+            return '\n'.join(messages['ad_list_row'].format(
+                ad_id=ad['id'],
+                state='on' if ad['is_active'] else 'off',
+                points=ad['points'],
+                weight=ad['weight'],
+                language=ad['language'] or 'all',
+                content=ad['content'][:40]
+            ) for ad in ads)
+        if command == 'create' and len(args) >= 5:
+            url = None if args[3] == '-' else args[3]
+            ad_id = create_ad(' '.join(args[4:]), url, points=int(args[1]), weight=int(args[2]))
+            return messages['ad_created'].format(ad_id=ad_id)
+
+        if command in ('activate', 'deactivate') and len(args) == 2:
+            fields = {'is_active': command == 'activate'}
+        elif command in ('weight', 'points') and len(args) == 3:
+            fields = {command: int(args[2])}
+        elif command == 'language' and len(args) == 3:
+            fields = {'language': None if args[2].lower() == 'all' else args[2].lower()}
+        else:
+            return messages['ad_usage']
+        ad_id = int(args[1])
+        if not update_ad(ad_id, **fields):
+            return messages['ad_not_found'].format(ad_id=ad_id)
+        return messages['ad_updated'].format(ad_id=ad_id)
+
+    @traced
+    @with_deadline
+    async def ad_admin_handler(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """
+        Handles /adadmin: lists, creates, (de)activates and re-weights ads and sets their points.
+
+        Changes reach every running bot through the ads trigger (version bump + NOTIFY);
+        this process also refreshes its catalog right away.
+
+        Args:
+            update (Update): The update object containing the message information
+            context (ContextTypes.DEFAULT_TYPE): The context object for the current update
+        """
+        if await self._reject_non_admin(update, context):
+            return
+
+        chat_type = update.effective_chat.type
+        chat_id = update.effective_chat.id
+        messages = self.handlers.get_text(chat_type, chat_id, 'ADMIN_MESSAGES')
+        try:
+            text = self._run_ad_command(context.args or [], messages)
+            if context.args and context.args[0].lower() != 'list':
+                self.handlers.ads.refresh_if_changed()
+        except ValueError as e:
+            text = messages['ad_invalid'].format(error=e)
+        except Exception as e:
+            logging.error(f"Error in ad_admin_handler: {e}", exc_info=True)
+            text = messages['ad_error']
+        # Telegram 메시지 길이 제한 (4096자)
+        await context.bot.send_message(chat_id=chat_id, text=text[:4000])
+
+    @traced
+    async def memory_stats_handler(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """
+        Handles /memstats: RSS, cache sizes, object counts and top allocation sites.
+
+        Allocation sites are only listed when MEMORY_DIAGNOSTICS=1 (tracemalloc running).
+
+        Args:
+            update (Update): The update object containing the message information
+            context (ContextTypes.DEFAULT_TYPE): The context object for the current update
+        """
+        if await self._reject_non_admin(update, context):
+            return
+
+        chat_id = update.effective_chat.id
+        lines = MemoryDiagnostics().report_lines()
+        # Telegram 메시지 길이 제한 (4096자)
+        await context.bot.send_message(chat_id=chat_id, text='\n'.join(lines)[:4000])
@@ -1,8 +1,19 @@
 import logging
+from datetime import datetime
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
+from telegram.error import BadRequest
 from psycopg2.extras import RealDictCursor
 from model.database import DatabaseConnection
+from model.ad_catalog import AdCatalog
+from model.ad_rotation import AdRotation
+from model.points import PointsStore
+from model.queries import run_query
+from model.shared_cache import LANGUAGE_CODES, LANGUAGES_BY_CODE, SharedCache
+from model.tenancy import current_tenant
+from handler.deadlines import with_deadline
+from handler.idempotency import idempotent
+from monitoring.tracing import Tracer, traced
 from messages.ko_texts import (
     MAIN_MENU as KO_MAIN_MENU,
     HELP_MENU as KO_HELP_MENU,
@@ -14,6 +25,8 @@ from messages.ko_texts import (
     CLAIM_VAL_MENU as KO_CLAIM_VAL_MENU,
     LANG_MESSAGES as KO_LANG_MESSAGES,
     USER_GROUP_MESSAGES as KO_USER_GROUP_MESSAGES,
+    ADMIN_MESSAGES as KO_ADMIN_MESSAGES,
+    RATE_LIMIT_MESSAGES as KO_RATE_LIMIT_MESSAGES,
 )
 from messages.en_texts import (
     MAIN_MENU as EN_MAIN_MENU,
@@ -25,7 +38,9 @@ from messages.en_texts import (
     POINT_MESSAGES as EN_POINT_MESSAGES,
     CLAIM_VAL_MENU as EN_CLAIM_VAL_MENU,
     LANG_MESSAGES as EN_LANG_MESSAGES,
-    USER_GROUP_MESSAGES as EN_USER_GROUP_MESSAGES
+    USER_GROUP_MESSAGES as EN_USER_GROUP_MESSAGES,
+    ADMIN_MESSAGES as EN_ADMIN_MESSAGES,
+    RATE_LIMIT_MESSAGES as EN_RATE_LIMIT_MESSAGES
 )
 
 VAL_UNIT = 10
@@ -51,7 +66,9 @@ class ButtonHandlers:
                 'POINT_MESSAGES': KO_POINT_MESSAGES,
                 'LANG_MESSAGES': KO_LANG_MESSAGES,
                 'USER_GROUP_MESSAGES': KO_USER_GROUP_MESSAGES,
-                'CLAIM_VAL_MENU': KO_CLAIM_VAL_MENU
+                'CLAIM_VAL_MENU': KO_CLAIM_VAL_MENU,
+                'ADMIN_MESSAGES': KO_ADMIN_MESSAGES,
+                'RATE_LIMIT_MESSAGES': KO_RATE_LIMIT_MESSAGES
             },
             'en': {
                 'MAIN_MENU': EN_MAIN_MENU,
@@ -63,11 +80,19 @@ class ButtonHandlers:
                 'POINT_MESSAGES': EN_POINT_MESSAGES,
                 'LANG_MESSAGES': EN_LANG_MESSAGES,
                 'USER_GROUP_MESSAGES': EN_USER_GROUP_MESSAGES,
-                'CLAIM_VAL_MENU': EN_CLAIM_VAL_MENU
+                'CLAIM_VAL_MENU': EN_CLAIM_VAL_MENU,
+                'ADMIN_MESSAGES': EN_ADMIN_MESSAGES,
+                'RATE_LIMIT_MESSAGES': EN_RATE_LIMIT_MESSAGES
             }
         }
-        # 채팅별 언어 설정을 저장하는 딕셔너리
+        # 채팅별 언어 설정을 저장하는 딕셔너리 (SHARED_CACHE=1 이면 대신 호스트 공유 메모리 사용)
         self.language_cache = {}
+        self.shared_cache = SharedCache()
+        # 광고를 본 (tenant prefix, owner_type, owner_id, DB 기준 날짜) - 자정에 비움 (메모리 정리용)
+        self.viewed_today = set()
+        self.ads = AdCatalog()
+        self.rotation = AdRotation()
+        self.points = PointsStore()
 
     def get_chat_key(self, chat_type: str, chat_id: int) -> str:
         """
@@ -80,7 +105,67 @@ class ButtonHandlers:
         Returns:
             str: Unique chat identifier
         """
-        return f"{chat_type}_{chat_id}"
+        # group/supergroup 은 같은 groups 테이블을 사용하므로 하나의 키로 저장
+        owner_type = 'user' if chat_type == 'private' else 'group'
+        return f"{current_tenant().cache_prefix}{owner_type}_{chat_id}"
+
+    def _cached_language(self, chat_type: str, chat_id: int) -> str:
+        """Language from the host's shared cache when enabled, otherwise from language_cache."""
+        if self.shared_cache.enabled:
+            owner_type = 'user' if chat_type == 'private' else 'group'
+            code = self.shared_cache.get(f"{current_tenant().cache_prefix}language:{owner_type}", chat_id)
+            return LANGUAGES_BY_CODE.get(code)
+        return self.language_cache.get(self.get_chat_key(chat_type, chat_id))
+
+    def _cache_language(self, chat_type: str, chat_id: int, language: str):
+        """Stores a chat's language in the shared cache when enabled, otherwise in language_cache."""
+        if self.shared_cache.enabled:
+            owner_type = 'user' if chat_type == 'private' else 'group'
+            self.shared_cache.set(
+                f"{current_tenant().cache_prefix}language:{owner_type}", chat_id, LANGUAGE_CODES[language]
+            )
+        else:
+            self.language_cache[self.get_chat_key(chat_type, chat_id)] = language
+
+    def reset_daily_state(self):
+        """Clears per-day state at the daily rollover."""
+        self.viewed_today.clear()
+        logging.info("Daily state reset")
+
+    def preload_languages(self, active_days: int) -> int:
+        """
+        Loads language settings of recently active users and groups into the cache.
+        
+        Args:
+            active_days (int): Chats registered or viewing an ad within this many days are loaded
+            
+        Returns:
+            int: Number of chats loaded
+        """
+        def fetch(cur):
+            cur.execute("""
+                SELECT 'private', u.user_id, u.language
+                FROM users u
+                WHERE u.created_at >= CURRENT_DATE - %s
+                OR u.user_id IN (
+                    SELECT owner_id FROM ad_view_logs
+                    WHERE owner_type = 'user' AND viewed_at >= CURRENT_DATE - %s
+                )
+                UNION ALL
+                SELECT 'group', g.group_id, g.language
+                FROM groups g
+                WHERE g.created_at >= CURRENT_DATE - %s
+                OR g.group_id IN (
+                    SELECT owner_id FROM ad_view_logs
+                    WHERE owner_type = 'group' AND viewed_at >= CURRENT_DATE - %s
+                )
+            """, (active_days, active_days, active_days, active_days))
+            return cur.fetchall()
+
+        rows = self.db.read(fetch)
+        for chat_type, chat_id, language in rows:
+            self._cache_language(chat_type, chat_id, language or 'ko')
+        return len(rows)
 
     async def set_language(self, chat_type: str, chat_id: int, language: str):
         """
@@ -92,73 +177,168 @@ class ButtonHandlers:
             language (str): Language code ('ko' or 'en')
         """
         try:
-            with self.db.get_cursor() as cur:
+            with self.db.get_cursor(pin_key=chat_id) as cur:
                 if chat_type == 'private':
-                    cur.execute("""
-                        UPDATE users 
-                        SET language = %s 
-                        WHERE user_id = %s
-                    """, (language, chat_id))
+                    run_query(cur, 'set_user_language', (language, chat_id))
                 else:
-                    cur.execute("""
-                        UPDATE groups 
-                        SET language = %s 
-                        WHERE group_id = %s
-                    """, (language, chat_id))
+                    run_query(cur, 'set_group_language', (language, chat_id))
                 
                 # Update cache
-                chat_key = self.get_chat_key(chat_type, chat_id)
-                self.language_cache[chat_key] = language
+                self._cache_language(chat_type, chat_id, language)
         except Exception as e:
             logging.error(f"Error in set_language: {e}")
 
-    def get_text(self, chat_type: str, chat_id: int, text_type: str) -> str:
+    def get_language(self, chat_type: str, chat_id: int) -> str:
         """
-        Gets the appropriate text based on cached language setting.
+        Gets the language setting of a chat from the cache.
         If not in cache, retrieves from database and updates cache.
         
         Args:
             chat_type (str): Type of chat ('private' or 'group')
             chat_id (int): ID of the chat
-            text_type (str): Type of text to retrieve
             
         Returns:
-            str: Text in the appropriate language
+            str: Language code ('ko' or 'en')
         """
-        chat_key = self.get_chat_key(chat_type, chat_id)
-        
         # Try to get language from cache first
-        lang = self.language_cache.get(chat_key)
+        with Tracer().span('cache.language') as span:
+            lang = self._cached_language(chat_type, chat_id)
+            if span:
+                span.set_attribute('hit', lang is not None)
+        
+        # Database is unhealthy or the handler ran out of time: answer with default text
+        if lang is None and not self.db.available():
+            return 'ko'
         
         # If not in cache, get from database and update cache
         if lang is None:
             try:
-                with self.db.get_cursor() as cur:
+                def fetch(cur):
                     if chat_type == 'private':
-                        cur.execute("""
-                            SELECT language 
-                            FROM users 
-                            WHERE user_id = %s
-                        """, (chat_id,))
+                        run_query(cur, 'user_language', (chat_id,))
                     else:
-                        cur.execute("""
-                            SELECT language 
-                            FROM groups 
-                            WHERE group_id = %s
-                        """, (chat_id,))
-                    
-                    result = cur.fetchone()
-                    lang = result['language'] if result else 'ko'  # Default to Korean if not found
-                    
-                    # Update cache
-                    self.language_cache[chat_key] = lang
+                        run_query(cur, 'group_language', (chat_id,))
+                    return cur.fetchone()
+                
+                result = self.db.read(fetch, cursor_factory=RealDictCursor, pin_key=chat_id)
+                lang = result['language'] if result else 'ko'  # Default to Korean if not found
+                
+                # Update cache
+                self._cache_language(chat_type, chat_id, lang)
             except Exception as e:
                 logging.error(f"Error in get_text: {e}")
-                lang = 'ko'  # Default to Korean on error
-                self.language_cache[chat_key] = lang
+                lang = 'ko'  # Default to Korean on error (not cached, so it is retried later)
         
+        return lang
+
+    def get_text(self, chat_type: str, chat_id: int, text_type: str) -> str:
+        """
+        Gets the appropriate text based on the chat's language setting.
+        
+        Args:
+            chat_type (str): Type of chat ('private' or 'group')
+            chat_id (int): ID of the chat
+            text_type (str): Type of text to retrieve
+            
+        Returns:
+            str: Text in the appropriate language
+        """
+        return self.texts[self.get_language(chat_type, chat_id)][text_type]
+
+    def cached_text(self, chat_type: str, chat_id: int, text_type: str) -> str:
+        """
+        Gets text from the cached language only, never querying the database.
+        Used when shedding load.
+
+        Args:
+            chat_type (str): Type of chat ('private' or 'group')
+            chat_id (int): ID of the chat
+            text_type (str): Type of text to retrieve
+
+        Returns:
+            str: Text in the cached language, Korean if not cached
+        """
+        lang = self._cached_language(chat_type, chat_id) or 'ko'
         return self.texts[lang][text_type]
 
+    def _main_menu_markup(self) -> InlineKeyboardMarkup:
+        """Builds the main menu keyboard."""
+        keyboard = [
+            [
+                InlineKeyboardButton("📢 AD", callback_data="menu_ad"),
+                InlineKeyboardButton("💰 Points", callback_data="menu_points")
+            ],
+            [
+                InlineKeyboardButton("📚 Help", callback_data="menu_help"),
+                InlineKeyboardButton("🌐 Language", callback_data="menu_language")
+            ]
+        ]
+        return InlineKeyboardMarkup(keyboard)
+
+    def _with_back_button(self, update: Update, keyboard: list) -> InlineKeyboardMarkup:
+        """
+        Appends a back-to-menu row when the screen is shown by editing a menu message.
+
+        Args:
+            update (Update): The update being handled
+            keyboard (list): Rows of InlineKeyboardButton
+
+        Returns:
+            InlineKeyboardMarkup: Keyboard markup, or None if there are no rows
+        """
+        if update.callback_query:
+            keyboard = keyboard + [[InlineKeyboardButton("⬅️ Back", callback_data="menu_main")]]
+        return InlineKeyboardMarkup(keyboard) if keyboard else None
+
+    async def _send_or_edit(self, update: Update, context: ContextTypes.DEFAULT_TYPE,
+                            text: str, reply_markup: InlineKeyboardMarkup = None,
+                            parse_mode: str = 'Markdown'):
+        """
+        Shows a screen by editing the message whose button was pressed.
+
+        Command updates and failed edits (message too old, not a text message, ...)
+        fall back to sending a new message. Nothing is sent when the message
+        already shows the same text and keyboard.
+
+        Args:
+            update (Update): The update being handled
+            context (ContextTypes.DEFAULT_TYPE): The context object for the current update
+            text (str): Message text
+            reply_markup (InlineKeyboardMarkup): Optional inline keyboard
+            parse_mode (str): Telegram parse mode
+        """
+        chat_id = update.effective_chat.id
+        query = update.callback_query
+        message = query.message if query else None
+
+        if message is not None and context.chat_data is not None:
+            # 마지막으로 그린 화면과 같으면 API 호출 생략
+            rendered = context.chat_data.get('rendered_menu')
+            current_markup = message.reply_markup or None
+            if rendered == (message.message_id, text) and current_markup == reply_markup:
+                return
+            try:
+                if rendered and rendered[0] == message.message_id and rendered[1] == text:
+                    await message.edit_reply_markup(reply_markup=reply_markup)
+                else:
+                    await message.edit_text(text=text, reply_markup=reply_markup, parse_mode=parse_mode)
+                context.chat_data['rendered_menu'] = (message.message_id, text)
+                return
+            except BadRequest as e:
+                if 'not modified' in str(e).lower():
+                    context.chat_data['rendered_menu'] = (message.message_id, text)
+                    return
+                logging.warning(f"Edit failed, sending new message instead: {e}")
+
+        await context.bot.send_message(
+            chat_id=chat_id,
+            text=text,
+            reply_markup=reply_markup,
+            parse_mode=parse_mode
+        )
+
+    @traced
+    @with_deadline
     async def start_handler(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """
         Handles the /start command for both private chats and group chats.
@@ -178,82 +358,46 @@ class ButtonHandlers:
         chat_type = update.effective_chat.type
         
         try:
-            with self.db.get_cursor(cursor_factory=RealDictCursor) as cur:
+            with self.db.get_cursor(cursor_factory=RealDictCursor, pin_key=chat_id) as cur:
                 if chat_type == 'private':
                     username = update.effective_user.username or f"user_{user_id}"
                     
-                    cur.execute("""
-                        SELECT user_id, language FROM users WHERE user_id = %s
-                    """, (user_id,))
+                    run_query(cur, 'find_user', (user_id,))
                     
                     result = cur.fetchone()
                     if not result:
-                        cur.execute("""
-                            INSERT INTO users (user_id, username, language)
-                            VALUES (%s, %s, 'ko')
-                        """, (user_id, username))
-                        
-                        cur.execute("""
-                            INSERT INTO points (owner_type, owner_id, point)
-                            VALUES ('user', %s, 0)
-                        """, (user_id,))
-                        
-                        await self.set_language(chat_type, user_id, 'ko')
-                        messages = self.get_text(chat_type, user_id, 'USER_GROUP_MESSAGES')
-                        message = messages['user_success_register']
-                    else:
-                        await self.set_language(chat_type, user_id, result['language'])
-                        messages = self.get_text(chat_type, user_id, 'USER_GROUP_MESSAGES')
-                        message = messages['user_already_exists']
-                        
+                        run_query(cur, 'insert_user', (user_id, username))
+                        run_query(cur, 'insert_points', ('user', user_id))
                 else:
                     group_name = update.effective_chat.title or f"group_{chat_id}"
                     
-                    cur.execute("""
-                        SELECT group_id, language FROM groups WHERE group_id = %s
-                    """, (chat_id,))
+                    run_query(cur, 'find_group', (chat_id,))
                     
                     result = cur.fetchone()
                     if not result:
-                        cur.execute("""
-                            INSERT INTO groups (group_id, group_name, language)
-                            VALUES (%s, %s, 'ko')
-                        """, (chat_id, group_name))
-                        
-                        cur.execute("""
-                            INSERT INTO points (owner_type, owner_id, point)
-                            VALUES ('group', %s, 0)
-                        """, (chat_id,))
-                        
-                        await self.set_language(chat_type, chat_id, 'ko')
-                        messages = self.get_text(chat_type, chat_id, 'USER_GROUP_MESSAGES')
-                        message = messages['group_success_register']
-                    else:
-                        await self.set_language(chat_type, chat_id, result['language'])
-                        messages = self.get_text(chat_type, chat_id, 'USER_GROUP_MESSAGES')
-                        message = messages['group_already_exists']
-                
-                await context.bot.send_message(chat_id=chat_id, text=message)
-                
-                # Show help menu after registration or if already registered
-                keyboard = [
-                    [
-                        InlineKeyboardButton("📢 AD", callback_data="menu_ad"),
-                        InlineKeyboardButton("💰 Points", callback_data="menu_points")
-                    ],
-                    [
-                        InlineKeyboardButton("📚 Help", callback_data="menu_help"),
-                        InlineKeyboardButton("🌐 Language", callback_data="menu_language")
-                    ]
-                ]
-                reply_markup = InlineKeyboardMarkup(keyboard)
-                main_menu = self.get_text(chat_type, chat_id, 'MAIN_MENU')
-                await context.bot.send_message(
-                    chat_id=chat_id,
-                    text=main_menu,
-                    reply_markup=reply_markup,
-                    parse_mode='Markdown'
-                )
+                        run_query(cur, 'insert_group', (chat_id, group_name))
+                        run_query(cur, 'insert_points', ('group', chat_id))
+            
+            # 등록이 커밋된 뒤에 언어 설정 및 메시지 전송 (연결을 잡은 채 await 하지 않음)
+            owner_id = user_id if chat_type == 'private' else chat_id
+            await self.set_language(chat_type, owner_id, result['language'] if result else 'ko')
+            messages = self.get_text(chat_type, owner_id, 'USER_GROUP_MESSAGES')
+            if chat_type == 'private':
+                message = messages['user_already_exists' if result else 'user_success_register']
+            else:
+                message = messages['group_already_exists' if result else 'group_success_register']
+            
+            await context.bot.send_message(chat_id=chat_id, text=message)
+            
+            # Show help menu after registration or if already registered
+            reply_markup = self._main_menu_markup()
+            main_menu = self.get_text(chat_type, chat_id, 'MAIN_MENU')
+            await context.bot.send_message(
+                chat_id=chat_id,
+                text=main_menu,
+                reply_markup=reply_markup,
+                parse_mode='Markdown'
+            )
                 
         except Exception as e:
             logging.error(f"Error in start_handler: {e}", exc_info=True)
@@ -261,6 +405,8 @@ class ButtonHandlers:
             error_message = messages['registration_error']
             await context.bot.send_message(chat_id=chat_id, text=error_message)
 
+    @traced
+    @with_deadline
     async def points_handler(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """
         Handles the /points command to display current points status.
@@ -279,31 +425,24 @@ class ButtonHandlers:
         user_id = update.effective_user.id
         
         try:
-            with self.db.get_cursor(cursor_factory=RealDictCursor) as cur:
-                if chat_type == 'private':
-                    cur.execute("""
-                        SELECT p.point 
-                        FROM points p 
-                        WHERE p.owner_type = 'user' AND p.owner_id = %s
-                    """, (user_id,))
-                    result = cur.fetchone()
-                    point = result['point'] if result else 0
-                    val = round(point / VAL_UNIT, 2)
-                    
-                    points_menu = self.get_text(chat_type, user_id, 'POINTS_MENU')
-                    message = points_menu['private'].format(point=point, val=val)
-                else:
-                    cur.execute("""
-                        SELECT p.point 
-                        FROM points p 
-                        WHERE p.owner_type = 'group' AND p.owner_id = %s
-                    """, (chat_id,))
-                    result = cur.fetchone()
-                    point = result['point'] if result else 0
-                    val = round(point / VAL_UNIT, 2)
-                    
-                    points_menu = self.get_text(chat_type, chat_id, 'POINTS_MENU')
-                    message = points_menu['group'].format(point=point, val=val)
+            if chat_type == 'private':
+                point = self.db.read(
+                    lambda cur: self.points.get_balance(cur, 'user', user_id),
+                    cursor_factory=RealDictCursor, pin_key=chat_id
+                )
+                val = round(point / VAL_UNIT, 2)
+                
+                points_menu = self.get_text(chat_type, user_id, 'POINTS_MENU')
+                message = points_menu['private'].format(point=point, val=val)
+            else:
+                point = self.db.read(
+                    lambda cur: self.points.get_balance(cur, 'group', chat_id),
+                    cursor_factory=RealDictCursor, pin_key=chat_id
+                )
+                val = round(point / VAL_UNIT, 2)
+                
+                points_menu = self.get_text(chat_type, chat_id, 'POINTS_MENU')
+                message = points_menu['group'].format(point=point, val=val)
             
             keyboard = [
                 [InlineKeyboardButton("Claim $Val", callback_data=f"claim_val_{point}")]
@@ -322,6 +461,8 @@ class ButtonHandlers:
             error_message = self.get_text(chat_type, chat_id, 'POINT_MESSAGES')['points_error']
             await context.bot.send_message(chat_id=chat_id, text=error_message)
 
+    @traced
+    @with_deadline
     async def ads_handler(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """
         Handles the /ads command to display the latest active advertisement.
@@ -338,40 +479,41 @@ class ButtonHandlers:
         try:
             chat_id = update.effective_chat.id
             chat_type = update.effective_chat.type
-            with self.db.get_cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute("""
-                    SELECT content, url
-                    FROM ads 
-                    WHERE is_active = TRUE 
-                    ORDER BY created_at DESC 
-                    LIMIT 1
-                """)
-                result = cur.fetchone()
-                print(f"ads_handler result: {result}")
+            ad_tag = current_tenant().ad_tag
+
+            def fetch(cur):
+                run_query(cur, 'latest_ad', (ad_tag, ad_tag))
+                return cur.fetchone()
+
+            result = self.db.read(fetch, cursor_factory=RealDictCursor)
+            logging.debug(f"ads_handler result: {result}")
+            
+            if result:
+                # URL이 있는 경우에만 버튼 추가
+                keyboard = []
+                if result['url']:
+                    keyboard = [
+                        [InlineKeyboardButton("광고 보러가기", url=result['url'])]
+                    ]
+                reply_markup = InlineKeyboardMarkup(keyboard) if keyboard else None
                 
-                if result:
-                    # URL이 있는 경우에만 버튼 추가
-                    keyboard = []
-                    if result['url']:
-                        keyboard = [
-                            [InlineKeyboardButton("광고 보러가기", url=result['url'])]
-                        ]
-                    reply_markup = InlineKeyboardMarkup(keyboard) if keyboard else None
-                    
-                    await context.bot.send_message(
-                        chat_id=chat_id,
-                        text=result['content'],
-                        reply_markup=reply_markup,
-                        parse_mode='Markdown'
-                    )
-                else:
-                    no_ads_error = self.get_text(chat_type, chat_id, 'AD_MESSAGES')['no_ads_error']
-                    await context.bot.send_message(chat_id=chat_id, text=no_ads_error, parse_mode='Markdown')
+                await context.bot.send_message(
+                    chat_id=chat_id,
+                    text=result['content'],
+                    reply_markup=reply_markup,
+                    parse_mode='Markdown'
+                )
+            else:
+                no_ads_error = self.get_text(chat_type, chat_id, 'AD_MESSAGES')['no_ads_error']
+                await context.bot.send_message(chat_id=chat_id, text=no_ads_error, parse_mode='Markdown')
         except Exception as e:
             logging.error(f"Error in ads_handler: {e}")
             ad_fetching_error = self.get_text(chat_type, chat_id, 'AD_MESSAGES')['ad_fetching_error']
             await context.bot.send_message(chat_id=chat_id, text=ad_fetching_error, parse_mode='Markdown')
 
+    @traced
+    @idempotent
+    @with_deadline
     async def claim_val_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         query = update.callback_query
         await query.answer()
@@ -385,14 +527,7 @@ class ButtonHandlers:
             points = 0
             with self.db.get_cursor(cursor_factory=RealDictCursor) as cur:
                 # Get current points
-                cur.execute("""
-                    SELECT point 
-                    FROM points 
-                    WHERE owner_type = %s AND owner_id = %s
-                """, (owner_type, chat_id))
-                result = cur.fetchone()
-                if result:
-                    points = result['point']
+                points = self.points.get_balance(cur, owner_type, chat_id)
             
             if points < 10:  # 최소 10 포인트 필요
                 failed_message = self.get_text(chat_type, chat_id, 'CLAIM_VAL_MENU')['failed']
@@ -403,46 +538,41 @@ class ButtonHandlers:
             points_to_convert = (points // 10) * 10
             val_amount = points_to_convert / 10
             
-            with self.db.get_cursor() as cur:
+            claimed = False
+            with self.db.get_cursor(pin_key=chat_id) as cur:
                 try:
                     cur.execute("BEGIN")
                     
                     if chat_type == 'private':
-                        cur.execute("""
-                            UPDATE points 
-                            SET point = point - %s 
-                            WHERE owner_type = 'user' AND owner_id = %s
-                            RETURNING point
-                        """, (points_to_convert, user_id))
+                        result = self.points.debit(cur, 'user', user_id, points_to_convert)
                     else:
-                        cur.execute("""
-                            UPDATE points 
-                            SET point = point - %s 
-                            WHERE owner_type = 'group' AND owner_id = %s
-                            RETURNING point
-                        """, (points_to_convert, chat_id))
+                        result = self.points.debit(cur, 'group', chat_id, points_to_convert)
                     
-                    result = cur.fetchone()
-                    if not result:
+                    if result is None:
                         raise Exception("포인트 차감 실패")
                     
                     # TODO: val 지급 처리 로직 추가!
                     
                     cur.execute("COMMIT")
-                    
-                    success_message = self.get_text(chat_type, chat_id, 'CLAIM_VAL_MENU')['success'].format(val=val_amount)
-                    await context.bot.send_message(chat_id=chat_id, text=success_message, parse_mode='Markdown')
+                    claimed = True
                     
                 except Exception as e:
                     cur.execute("ROLLBACK")
                     logging.error(f"Error in Claim Val: {e}")
-                    failed_message = self.get_text(chat_type, chat_id, 'CLAIM_VAL_MENU')['failed']
-                    await context.bot.send_message(chat_id=chat_id, text=failed_message, parse_mode='Markdown')
+            
+            if claimed:
+                success_message = self.get_text(chat_type, chat_id, 'CLAIM_VAL_MENU')['success'].format(val=val_amount)
+                await context.bot.send_message(chat_id=chat_id, text=success_message, parse_mode='Markdown')
+            else:
+                failed_message = self.get_text(chat_type, chat_id, 'CLAIM_VAL_MENU')['failed']
+                await context.bot.send_message(chat_id=chat_id, text=failed_message, parse_mode='Markdown')
                 
         except Exception as e:
             logging.error(f"Error in claim_val_callback: {e}")
             await context.bot.send_message(chat_id=chat_id, text="❌ Claim failed: An error occurred", parse_mode='Markdown')
 
+    @traced
+    @with_deadline
     async def menu_handler(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """
         Handles the /help command by displaying the main menu with interactive buttons.
@@ -460,25 +590,11 @@ class ButtonHandlers:
         chat_type = update.effective_chat.type
         chat_id = update.effective_chat.id
         
-        keyboard = [
-            [
-                InlineKeyboardButton("📢 AD", callback_data="menu_ad"),
-                InlineKeyboardButton("💰 Points", callback_data="menu_points")
-            ],
-            [
-                InlineKeyboardButton("📚 Help", callback_data="menu_help"),
-                InlineKeyboardButton("🌐 Language", callback_data="menu_language")
-            ]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
         main_menu = self.get_text(chat_type, chat_id, 'MAIN_MENU')
-        await context.bot.send_message(
-            chat_id=chat_id,
-            text=main_menu,
-            reply_markup=reply_markup,
-            parse_mode='Markdown'
-        )
+        await self._send_or_edit(update, context, main_menu, reply_markup=self._main_menu_markup())
         
+    @traced
+    @with_deadline
     async def language_handler(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """
         Handles the /language command by showing the language selection menu.
@@ -501,153 +617,131 @@ class ButtonHandlers:
             parse_mode='Markdown'
         )
         
+    @traced
+    @with_deadline
     async def _handle_help_action(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """도움말 메뉴 표시"""
         chat_type = update.effective_chat.type
         chat_id = update.effective_chat.id
         help_menu = self.get_text(chat_type, chat_id, 'HELP_MENU')
-        await context.bot.send_message(
-            chat_id=chat_id,
-            text=help_menu, 
-            parse_mode='Markdown'
-        )
+        await self._send_or_edit(update, context, help_menu, reply_markup=self._with_back_button(update, []))
 
+    @traced
+    @with_deadline
     async def _handle_points_action(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """포인트 현황 표시"""
         chat_type = update.effective_chat.type
         chat_id = update.effective_chat.id
         try:
-            with self.db.get_cursor(cursor_factory=RealDictCursor) as cur:
-                if chat_type == 'private':
-                    cur.execute("""
-                        SELECT p.point 
-                        FROM points p 
-                        WHERE p.owner_type = 'user' AND p.owner_id = %s
-                    """, (chat_id,))
-                    result = cur.fetchone()
-                    point = result['point'] if result else 0
-                    val = round(point / VAL_UNIT, 2)
-                    points_menu = self.get_text(chat_type, chat_id, 'POINTS_MENU')
-                    message = points_menu['private'].format(point=point, val=val)
-                else:
-                    cur.execute("""
-                        SELECT p.point 
-                        FROM points p 
-                        WHERE p.owner_type = 'group' AND p.owner_id = %s
-                    """, (chat_id,))
-                    result = cur.fetchone()
-                    point = result['point'] if result else 0
-                    val = round(point / VAL_UNIT, 2)
-                    points_menu = self.get_text(chat_type, chat_id, 'POINTS_MENU')
-                    message = points_menu['group'].format(point=point, val=val)
-                    
-                keyboard = [[InlineKeyboardButton("Claim $Val", callback_data=f"claim_val_{point}")]]
-                reply_markup = InlineKeyboardMarkup(keyboard) if keyboard else None
+            owner_type = 'user' if chat_type == 'private' else 'group'
+            point = self.db.read(
+                lambda cur: self.points.get_balance(cur, owner_type, chat_id),
+                cursor_factory=RealDictCursor, pin_key=chat_id
+            )
+            val = round(point / VAL_UNIT, 2)
+            points_menu = self.get_text(chat_type, chat_id, 'POINTS_MENU')
+            message = points_menu['private' if chat_type == 'private' else 'group'].format(point=point, val=val)
+            
+            keyboard = [[InlineKeyboardButton("Claim $Val", callback_data=f"claim_val_{point}")]]
+            reply_markup = self._with_back_button(update, keyboard)
                 
-                await context.bot.send_message(
-                    chat_id=chat_id, 
-                    text=message, 
-                    reply_markup=reply_markup,
-                    parse_mode='Markdown' 
-                )
+            await self._send_or_edit(update, context, message, reply_markup=reply_markup)
                 
         except Exception as e:
             logging.error(f"Error in points callback: {e}")
             error_message = self.get_text(chat_type, chat_id, 'POINT_MESSAGES')['points_error']
-            await context.bot.send_message(chat_id=chat_id, text=error_message)
+            # 메뉴 메시지를 오류 문구로 바꾸더라도 돌아갈 버튼은 남김
+            await self._send_or_edit(
+                update, context, error_message, reply_markup=self._with_back_button(update, []), parse_mode=None
+            )
 
+    @traced
+    @with_deadline
     async def _handle_ad_action(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """광고 표시 및 포인트 지급"""
         chat_type = update.effective_chat.type
         chat_id = update.effective_chat.id
+        owner_type = 'user' if chat_type == 'private' else 'group'
         try:
-            with self.db.get_cursor(cursor_factory=RealDictCursor) as cur:
-                owner_type = 'user' if chat_type == 'private' else 'group'
+            # Next ad of the chat's language pool (from the catalog once the scheduler loaded it)
+            language = self.get_language(chat_type, chat_id)
+            if self.ads.loaded:
+                result = self.rotation.next_ad(owner_type, chat_id, language)
+            else:
+                ad_tag = current_tenant().ad_tag
+
+                def fetch(cur):
+                    run_query(cur, 'random_ad', (ad_tag, ad_tag, language))
+                    return cur.fetchone()
+
+                result = self.db.read(fetch, cursor_factory=RealDictCursor)
+            logging.info(f"Ad result: {result}")
+            
+            # 날짜는 CURRENT_DATE 와 같은 DB 시간대로 계산하므로 지난 날의 항목은 적중하지 않음
+            today = datetime.now(self.db.timezone()).date()
+            viewed_key = (current_tenant().cache_prefix, owner_type, chat_id, today)
+            
+            with self.db.get_cursor(cursor_factory=RealDictCursor, pin_key=chat_id) as cur:
                 logging.info(f"Processing ad action - chat_type: {chat_type}, chat_id: {chat_id}")
                 
                 # Check if user/group has already viewed an ad today
-                cur.execute("""
-                    SELECT id 
-                    FROM ad_view_logs 
-                    WHERE owner_type = %s 
-                    AND owner_id = %s 
-                    AND DATE(viewed_at) = CURRENT_DATE
-                """, (owner_type, chat_id))
-                
-                has_viewed_today = cur.fetchone() is not None
+                if viewed_key in self.viewed_today:
+                    has_viewed_today = True
+                else:
+                    run_query(cur, 'viewed_ad_today', (owner_type, chat_id))
+                    
+                    has_viewed_today = cur.fetchone() is not None
+                    if has_viewed_today:
+                        self.viewed_today.add(viewed_key)
                 logging.info(f"Has viewed today: {has_viewed_today}")
                 
-                # Get a random active advertisement
-                cur.execute("""
-                    SELECT id, content, url, points
-                    FROM ads 
-                    WHERE is_active = TRUE 
-                    ORDER BY RANDOM() 
-                    LIMIT 1
-                """)
-                result = cur.fetchone()
-                logging.info(f"Ad result: {result}")
-                
                 if result:
-                    ad_menu = self.get_text(chat_type, chat_id, 'AD_MENU')
-                    logging.info(f"Ad menu: {ad_menu}")
-                    
                     if not has_viewed_today:
                         
                         # Update points
-                        cur.execute("""
-                            UPDATE points 
-                            SET point = point + %s 
-                            WHERE owner_type = %s AND owner_id = %s
-                            RETURNING point
-                        """, (result['points'], owner_type, chat_id))
-                        
-                        updated_points = cur.fetchone()['point']
+                        updated_points = self.points.credit(cur, owner_type, chat_id, result['points'])
+                        if updated_points is None:
+                            raise Exception("포인트 적립 실패")
                         logging.info(f"Updated points: {updated_points}")
                         
                         # Log the ad view
-                        cur.execute("""
-                            INSERT INTO ad_view_logs (owner_type, owner_id, ad_id, points_earned)
-                            VALUES (%s, %s, %s, %s)
-                        """, (owner_type, chat_id, result['id'], result['points']))
+                        run_query(cur, 'insert_ad_view_log', (owner_type, chat_id, result['id'], result['points']))
                         
                     else:
                         # Get current points
-                        cur.execute("""
-                            SELECT point 
-                            FROM points 
-                            WHERE owner_type = %s AND owner_id = %s
-                        """, (owner_type, chat_id))
-                        current_points = cur.fetchone()['point']
+                        current_points = self.points.get_balance(cur, owner_type, chat_id)
                         logging.info(f"Current points: {current_points}")
-                        
-                    message = ad_menu['success'].format(content=result['content'])
-                    
-                    # URL이 있는 경우에만 버튼 추가
-                    keyboard = []
-                    if result['url']:
-                        keyboard = [[InlineKeyboardButton("광고 보러가기", url=result['url'])]]
-                    reply_markup = InlineKeyboardMarkup(keyboard) if keyboard else None
-                    
-                    await context.bot.send_message(
-                        chat_id=chat_id,
-                        text=message,
-                        reply_markup=reply_markup,
-                        parse_mode='Markdown'
-                    )
-                else:
-                    ad_menu = self.get_text(chat_type, chat_id, 'AD_MENU')
-                    await context.bot.send_message(
-                        chat_id=chat_id, text=ad_menu['no_ad'], parse_mode='Markdown'
-                    )
+            
+            # 커밋된 후에만 오늘 본 것으로 기록
+            if result:
+                self.viewed_today.add(viewed_key)
+            
+            # 트랜잭션이 끝난 뒤에 화면 갱신 (연결을 잡은 채 await 하지 않음)
+            ad_menu = self.get_text(chat_type, chat_id, 'AD_MENU')
+            if result:
+                message = ad_menu['success'].format(content=result['content'])
+                
+                # URL이 있는 경우에만 버튼 추가
+                keyboard = []
+                if result['url']:
+                    keyboard = [[InlineKeyboardButton("광고 보러가기", url=result['url'])]]
+                reply_markup = self._with_back_button(update, keyboard)
+                
+                await self._send_or_edit(update, context, message, reply_markup=reply_markup)
+            else:
+                await self._send_or_edit(
+                    update, context, ad_menu['no_ad'], reply_markup=self._with_back_button(update, [])
+                )
                     
         except Exception as e:
             logging.error(f"Error in ad callback: {e}", exc_info=True)
             error_message = self.get_text(chat_type, chat_id, 'AD_MESSAGES')['ad_error']
-            await context.bot.send_message(
-                chat_id=chat_id, text=error_message, parse_mode='Markdown'
+            await self._send_or_edit(
+                update, context, error_message, reply_markup=self._with_back_button(update, [])
             )
 
+    @traced
+    @with_deadline
     async def _handle_language_action(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """언어 설정 메뉴 표시"""
         chat_type = update.effective_chat.type
@@ -658,12 +752,13 @@ class ButtonHandlers:
                 InlineKeyboardButton("🇺🇸 English", callback_data="lang_en")
             ]
         ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = self._with_back_button(update, keyboard)
         language_menu = self.get_text(chat_type, chat_id, 'LANGUAGE_MENU')
-        await context.bot.send_message(
-            chat_id=chat_id, text=language_menu, reply_markup=reply_markup, parse_mode='Markdown'
-        )
+        await self._send_or_edit(update, context, language_menu, reply_markup=reply_markup)
 
+    @traced
+    @idempotent
+    @with_deadline
     async def menu_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """
         Handles all menu button callbacks from the main menu.
@@ -673,6 +768,9 @@ class ButtonHandlers:
         - points: Shows current points status for user or group
         - ad: Displays the latest active advertisement and awards points if eligible
         - language: Shows language selection options
+        - main: Returns to the main menu
+        
+        Screens are shown by editing the pressed message in place.
         
         Args:
             update (Update): The update object containing the callback query
@@ -687,6 +785,7 @@ class ButtonHandlers:
         
         # Action에 따른 처리 함수 매핑
         action_handlers = {
+            'main': self.menu_handler,
             'help': self._handle_help_action,
             'points': self._handle_points_action,
             'ad': self._handle_ad_action,
@@ -700,6 +799,9 @@ class ButtonHandlers:
         else:
             logging.error(f"Unknown action: {action}")
 
+    @traced
+    @idempotent
+    @with_deadline
     async def language_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """
         Handles language selection callbacks.
@@ -720,32 +822,24 @@ class ButtonHandlers:
         chat_id = update.effective_chat.id
         
         try:
-            with self.db.get_cursor() as cur:
+            with self.db.get_cursor(pin_key=chat_id) as cur:
                 if chat_type == 'private':
-                    cur.execute("""
-                        UPDATE users 
-                        SET language = %s 
-                        WHERE user_id = %s
-                    """, (selected_lang, chat_id))
+                    run_query(cur, 'set_user_language', (selected_lang, chat_id))
                 else:
-                    cur.execute("""
-                        UPDATE groups 
-                        SET language = %s 
-                        WHERE group_id = %s
-                    """, (selected_lang, chat_id))
+                    run_query(cur, 'set_group_language', (selected_lang, chat_id))
                 
-                # 언어 설정 업데이트
-                await self.set_language(chat_type, chat_id, selected_lang)
+                # 언어 설정 업데이트 (위에서 이미 저장했으므로 캐시만 갱신)
+                self._cache_language(chat_type, chat_id, selected_lang)
                 
             lang_messages = self.get_text(chat_type, chat_id, 'LANG_MESSAGES')
             lang_message = lang_messages['language_success_ko'] if selected_lang == 'ko' else lang_messages['language_success_en']
-            await context.bot.send_message(
-                chat_id=chat_id, text=lang_message, parse_mode='Markdown'
+            await self._send_or_edit(
+                update, context, lang_message, reply_markup=self._with_back_button(update, [])
             )
             
         except Exception as e:
             logging.error(f"Error in language_callback: {e}")
             error_message = self.get_text(chat_type, chat_id, 'LANG_MESSAGES')['language_error']
-            await context.bot.send_message(
-                chat_id=chat_id, text=error_message, parse_mode='Markdown'
+            await self._send_or_edit(
+                update, context, error_message, reply_markup=self._with_back_button(update, [])
             )
\ No newline at end of file
@@ -0,0 +1,75 @@
+import asyncio
+import logging
+import os
+from functools import wraps
+from telegram.error import TelegramError
+from dotenv import load_dotenv
+from model.database import deadline
+
+load_dotenv()
+
+# 기본 handler deadline (초)
+DEFAULT_DEADLINE = float(os.getenv('HANDLER_DEADLINE_SECONDS', '5'))
+# deadline 이후 degraded 응답을 보낼 여유 시간
+DEADLINE_GRACE = float(os.getenv('HANDLER_DEADLINE_GRACE_SECONDS', '5'))
+
+
+def _parse_deadlines(value: str) -> dict:
+    """
+    Parses per-handler overrides, e.g. "_handle_ad_action=3,points_handler=2".
+
+    Args:
+        value (str): Comma separated name=seconds pairs
+
+    Returns:
+        dict: Handler name to deadline in seconds
+    """
+    deadlines = {}
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        name, _, seconds = item.partition('=')
+        try:
+            deadlines[name.strip()] = float(seconds)
+        except ValueError:
+            logging.error(f"Invalid HANDLER_DEADLINES entry: {item}")
+    return deadlines
+
+
+HANDLER_DEADLINES = _parse_deadlines(os.getenv('HANDLER_DEADLINES', ''))
+
+
+def with_deadline(func):
+    """
+    Decorator for handler coroutines: bounds their database time.
+
+    Database access after the deadline raises DeadlineExceeded, so the
+    handler's error path replies from cached or static text right away.
+    The coroutine as a whole is cancelled after deadline + grace and the
+    chat gets a short "busy" reply in its cached language instead.
+    """
+    seconds = HANDLER_DEADLINES.get(func.__name__, DEFAULT_DEADLINE)
+
+    @wraps(func)
+    async def wrapper(self, update, context, *args, **kwargs):
+        with deadline(seconds):
+            try:
+                return await asyncio.wait_for(
+                    func(self, update, context, *args, **kwargs), seconds + DEADLINE_GRACE
+                )
+            except asyncio.TimeoutError:
+                logging.error(f"{func.__name__} cancelled after {seconds + DEADLINE_GRACE}s")
+                await _reply_degraded(self, update, context)
+    return wrapper
+
+
+async def _reply_degraded(owner, update, context):
+    """Tells the chat to retry, using only cached text (no database access)."""
+    chat = update.effective_chat
+    if chat is None:
+        return
+    # AdminHandlers 는 ButtonHandlers 를 handlers 로 가지고 있음
+    handlers = getattr(owner, 'handlers', owner)
+    text = handlers.cached_text(chat.type, chat.id, 'RATE_LIMIT_MESSAGES')['busy']
+    try:
+        await context.bot.send_message(chat_id=chat.id, text=text)
+    except TelegramError as e:
+        logging.error(f"Error sending degraded reply: {e}")
@@ -0,0 +1,61 @@
+import logging
+import os
+from functools import wraps
+from telegram.error import TelegramError
+from dotenv import load_dotenv
+from model.idempotency import IdempotencyStore
+from monitoring.metrics import Metrics
+
+load_dotenv()
+
+# 같은 메시지의 같은 버튼을 이 시간 안에 다시 누르면 중복으로 처리 (0이면 사용 안 함)
+DOUBLE_TAP_SECONDS = float(os.getenv('IDEMPOTENCY_TAP_SECONDS', '1'))
+
+
+def delivery_keys(update, bot_id: int) -> list:
+    """
+    Idempotency keys of an update: its update id, callback query id and,
+    for button presses, the pressed button for double taps.
+
+    Returns:
+        list: (key, ttl seconds) pairs; ttl None means the store default
+    """
+    keys = [(f"update:{bot_id}:{update.update_id}", None)]
+    query = update.callback_query
+    if query:
+        keys.append((f"callback:{query.id}", None))
+        if DOUBLE_TAP_SECONDS > 0 and query.message:
+            keys.append((
+                f"tap:{bot_id}:{query.from_user.id}:{query.message.message_id}:{query.data}",
+                DOUBLE_TAP_SECONDS
+            ))
+    return keys
+
+
+def idempotent(func):
+    """
+    Decorator for handler coroutines: handles each delivery once.
+
+    Redelivered updates and double-tapped buttons are acknowledged with an
+    empty query.answer() (what the first delivery already did) and not run again.
+    If the handler raises, its keys are released so a retry is handled.
+    """
+    @wraps(func)
+    async def wrapper(self, update, context, *args, **kwargs):
+        store = IdempotencyStore()
+        keys = delivery_keys(update, context.bot.id)
+        if not store.claim(keys):
+            Metrics().incr('idempotency.duplicates')
+            logging.info(f"Skipping duplicate delivery of update {update.update_id} in {func.__name__}")
+            if update.callback_query:
+                try:
+                    await update.callback_query.answer()
+                except TelegramError as e:
+                    logging.error(f"Error answering duplicate callback: {e}")
+            return
+        try:
+            return await func(self, update, context, *args, **kwargs)
+        except Exception:
+            store.release(keys)
+            raise
+    return wrapper
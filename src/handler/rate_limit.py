@@ -0,0 +1,156 @@
+import logging
+import os
+import time
+from telegram import Update
+from telegram.error import TelegramError
+from dotenv import load_dotenv
+from model.tenancy import current_tenant
+from monitoring.metrics import Metrics
+
+load_dotenv()
+
+
+class TokenBucket:
+    """
+    Classic token bucket: holds up to burst tokens, refilled at rate per second.
+    """
+    __slots__ = ('rate', 'burst', 'tokens', 'updated_at')
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def take(self, now: float = None) -> bool:
+        """Takes one token; returns False if the bucket is empty."""
+        self._refill(time.monotonic() if now is None else now)
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def is_full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.burst
+
+
+class InboundLimiter:
+    """
+    Sheds abusive and excess updates before they reach the handlers.
+
+    Every update takes a token from its user's and its chat's bucket
+    (RATE_LIMIT_USER_* / RATE_LIMIT_CHAT_*, rate 0 disables) and is refused
+    while more than MAX_PENDING_UPDATES updates are queued or being handled
+    across all bots. Refused button presses get a short toast through
+    query.answer(); refused messages are dropped silently.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(InboundLimiter, cls).__new__(cls)
+            cls._instance._initialize()
+        return cls._instance
+
+    def _initialize(self):
+        self.user_rate = float(os.getenv('RATE_LIMIT_USER_RATE', '1'))
+        self.user_burst = float(os.getenv('RATE_LIMIT_USER_BURST', '5'))
+        self.chat_rate = float(os.getenv('RATE_LIMIT_CHAT_RATE', '3'))
+        self.chat_burst = float(os.getenv('RATE_LIMIT_CHAT_BURST', '15'))
+        # 0이면 대기 중인 update 수를 제한하지 않음
+        self.max_pending = int(os.getenv('MAX_PENDING_UPDATES', '200'))
+        # 버킷 수가 이 값을 넘으면 가득 찬(한동안 요청이 없던) 버킷을 정리
+        self.max_buckets = int(os.getenv('RATE_LIMIT_MAX_BUCKETS', '10000'))
+        # (tenant prefix, 'user' or 'chat', id) -> TokenBucket
+        self.buckets = {}
+        self.update_queues = []
+        self.in_flight = 0
+
+    def register_queue(self, update_queue):
+        """Adds a bot's update queue to the pending update count."""
+        self.update_queues.append(update_queue)
+
+    @property
+    def pending(self) -> int:
+        return self.in_flight + sum(queue.qsize() for queue in self.update_queues)
+
+    def _bucket(self, kind: str, key: int, rate: float, burst: float) -> TokenBucket:
+        bucket_key = (current_tenant().cache_prefix, kind, key)
+        bucket = self.buckets.get(bucket_key)
+        if bucket is None:
+            if len(self.buckets) >= self.max_buckets:
+                self.prune()
+            bucket = self.buckets[bucket_key] = TokenBucket(rate, burst)
+        return bucket
+
+    def prune(self) -> int:
+        """
+        Drops buckets that refilled completely (they behave like new ones).
+
+        Returns:
+            int: Number of buckets dropped
+        """
+        now = time.monotonic()
+        idle = [key for key, bucket in self.buckets.items() if bucket.is_full(now)]
+        for key in idle:
+            del self.buckets[key]
+        return len(idle)
+
+    def check(self, update: Update) -> str:
+        """
+        Decides whether an update may be handled.
+
+        Returns:
+            str: None if admitted, otherwise the RATE_LIMIT_MESSAGES key to answer with
+        """
+        if self.max_pending and self.pending > self.max_pending:
+            Metrics().incr('inbound.shed.overload')
+            return 'busy'
+        now = time.monotonic()
+        user = update.effective_user
+        if user and self.user_rate > 0:
+            if not self._bucket('user', user.id, self.user_rate, self.user_burst).take(now):
+                Metrics().incr('inbound.shed.user')
+                return 'slow_down'
+        chat = update.effective_chat
+        if chat and self.chat_rate > 0 and chat.type != 'private':
+            if not self._bucket('chat', chat.id, self.chat_rate, self.chat_burst).take(now):
+                Metrics().incr('inbound.shed.chat')
+                return 'slow_down'
+        return None
+
+    async def admit(self, update: Update, handlers) -> bool:
+        """
+        Checks an update and answers refused button presses with a toast.
+
+        An admitted update counts as in flight until release() is called.
+
+        Args:
+            update (Update): Incoming update
+            handlers (ButtonHandlers): Used for cached language texts (no database access)
+
+        Returns:
+            bool: True if the update should be handled
+        """
+        reason = self.check(update)
+        if reason is None:
+            self.in_flight += 1
+            return True
+        query = update.callback_query
+        if query:
+            chat = update.effective_chat
+            messages = handlers.cached_text(chat.type, chat.id, 'RATE_LIMIT_MESSAGES') if chat else {}
+            try:
+                await query.answer(messages.get(reason))
+            except TelegramError as e:
+                logging.error(f"Error answering rate limited callback: {e}")
+        return False
+
+    def release(self):
+        """Marks an admitted update as finished."""
+        self.in_flight = max(0, self.in_flight - 1)
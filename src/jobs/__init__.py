@@ -0,0 +1,3 @@
+"""
+Background job package for scheduled maintenance work
+"""
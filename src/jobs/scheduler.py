@@ -0,0 +1,136 @@
+import asyncio
+import inspect
+import logging
+import random
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from monitoring.metrics import Metrics
+
+
+class Job:
+    """
+    A named periodic job.
+
+    Runs every `interval` seconds, or once a day at `daily_at` (a datetime.time
+    in `timezone`) when given. Each run is delayed by up to `jitter` seconds so
+    several processes do not hit the database at the same instant.
+    """
+
+    def __init__(self, name: str, func, interval: float = None, daily_at=None,
+                 timezone: str = 'UTC', jitter: float = 0.0, run_at_start: bool = False):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.daily_at = daily_at
+        self.timezone = ZoneInfo(timezone)
+        self.jitter = jitter
+        self.run_at_start = run_at_start
+        self.running = False
+
+    def next_delay(self) -> float:
+        """Seconds until the next run, including jitter."""
+        if self.daily_at is not None:
+            now = datetime.now(self.timezone)
+            next_run = datetime.combine(now.date(), self.daily_at, tzinfo=self.timezone)
+            if next_run <= now:
+                next_run += timedelta(days=1)
+            delay = (next_run - now).total_seconds()
+        else:
+            delay = self.interval
+        return delay + random.uniform(0, self.jitter)
+
+
+class Scheduler:
+    """
+    Minimal asyncio scheduler running on the bot's event loop.
+
+    Provides named jobs with jitter, overlap protection (a run is skipped while
+    the previous one is still going) and run-duration metrics. Job functions
+    run on the loop; blocking ones are wrapped to run in a worker thread
+    (see jobs.tasks.in_worker_thread).
+    """
+
+    def __init__(self):
+        self.jobs = {}
+        self.metrics = Metrics()
+        self._loops = {}
+        self._runs = set()
+
+    def add_job(self, job: Job):
+        """
+        Registers a job. Jobs with neither an interval nor a daily time are ignored.
+
+        Args:
+            job (Job): The job to register
+        """
+        if not job.interval and job.daily_at is None:
+            logging.info(f"Job {job.name} disabled")
+            return
+        self.jobs[job.name] = job
+        if self._loops:
+            self._loops[job.name] = asyncio.create_task(self._loop(job))
+
+    def start(self):
+        """Starts all registered jobs. Must be called from the running event loop."""
+        for name, job in self.jobs.items():
+            if name not in self._loops:
+                self._loops[name] = asyncio.create_task(self._loop(job))
+        logging.info(f"Scheduler started with jobs: {', '.join(self.jobs) or 'none'}")
+
+    async def stop(self):
+        tasks = list(self._loops.values()) + list(self._runs)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loops.clear()
+        self._runs.clear()
+
+    def run_now(self, name: str):
+        """
+        Triggers a job immediately in the background (subject to overlap protection).
+
+        Args:
+            name (str): Name of the job
+        """
+        task = asyncio.create_task(self.run(self.jobs[name]))
+        self._runs.add(task)
+        task.add_done_callback(self._runs.discard)
+        return task
+
+    async def _loop(self, job: Job):
+        if job.run_at_start:
+            self.run_now(job.name)
+        while True:
+            await asyncio.sleep(job.next_delay())
+            # 별도 task로 실행해 주기가 실행 시간에 밀리지 않도록 함
+            self.run_now(job.name)
+
+    async def run(self, job: Job):
+        """
+        Runs a job once, recording its duration and outcome.
+
+        Args:
+            job (Job): The job to run
+        """
+        if job.running:
+            logging.warning(f"Job {job.name} still running, skipping this run")
+            self.metrics.incr(f"job.{job.name}.skipped")
+            return
+        job.running = True
+        start = time.perf_counter()
+        try:
+            result = job.func()
+            if inspect.isawaitable(result):
+                await result
+            self.metrics.incr(f"job.{job.name}.succeeded")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error(f"Error in job {job.name}: {e}", exc_info=True)
+            self.metrics.incr(f"job.{job.name}.failed")
+        finally:
+            job.running = False
+            duration_ms = (time.perf_counter() - start) * 1000
+            self.metrics.observe(f"job.{job.name}.duration_ms", duration_ms)
+            logging.info(f"Job {job.name} finished in {duration_ms:.1f}ms")
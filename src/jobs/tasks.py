@@ -0,0 +1,209 @@
+import asyncio
+import inspect
+import logging
+import os
+import time
+from datetime import time as dtime
+from dotenv import load_dotenv
+from model.database import DatabaseConnection
+from model.ad_catalog import AdCatalog
+from model.ad_rotation import AdRotation
+from model.rollups import ROLLUP_NAME, update_ad_daily_stats
+from model.points import PointsStore
+from model.archive import ARCHIVE_AFTER_DAYS, archive_ad_view_logs
+from model.idempotency import IdempotencyStore
+from model.tenancy import TENANTS, use_tenant
+from monitoring.metrics import Metrics
+from monitoring.health import Readiness
+from monitoring.memory import MemoryDiagnostics
+from jobs.scheduler import Job, Scheduler
+
+load_dotenv()
+
+JITTER = float(os.getenv('SCHEDULER_JITTER_SECONDS', '5'))
+# 일일 초기화 기준 시간대 (viewed_today 항목은 DB 날짜를 포함하므로 달라도 적립이 막히지 않음)
+DAILY_ROLLOVER_TZ = os.getenv('DAILY_ROLLOVER_TZ', 'UTC')
+# 0이면 ad_view_logs 정리를 하지 않음
+AD_VIEW_LOG_RETENTION_DAYS = int(os.getenv('AD_VIEW_LOG_RETENTION_DAYS', '0'))
+PRUNE_BATCH_SIZE = int(os.getenv('PRUNE_BATCH_SIZE', '5000'))
+WARM_ACTIVE_DAYS = int(os.getenv('WARM_ACTIVE_DAYS', '7'))
+
+
+def _interval(name: str, default: str) -> float:
+    """Reads JOB_<NAME>_INTERVAL in seconds; 0 disables the job."""
+    return float(os.getenv(f"JOB_{name.upper()}_INTERVAL", default))
+
+
+def in_worker_thread(func):
+    """
+    Wraps a blocking job so it runs in a worker thread instead of on the event loop.
+
+    Database work there checks out its own pooled connection, so it neither
+    delays handlers nor shares their transactions.
+
+    Args:
+        func: Sync job function
+    """
+    async def run():
+        return await asyncio.to_thread(func)
+    return run
+
+
+def for_each_schema(func):
+    """
+    Wraps a job so it runs once per distinct tenant schema.
+
+    Tenants sharing the default tables are handled by a single run.
+    Sync functions run in a worker thread (see in_worker_thread).
+
+    Args:
+        func: Job function (sync or async) to run under each tenant
+    """
+    async def run():
+        seen = set()
+        for tenant in TENANTS:
+            if tenant.schema in seen:
+                continue
+            seen.add(tenant.schema)
+            with use_tenant(tenant):
+                try:
+                    if inspect.iscoroutinefunction(func):
+                        await func()
+                    else:
+                        # to_thread 는 context 를 복사하므로 tenant 가 그대로 적용됨
+                        await asyncio.to_thread(func)
+                except Exception as e:
+                    logging.error(f"Job failed for tenant {tenant.name}: {e}", exc_info=True)
+                    Metrics().incr(f"tenant.{tenant.name}.job_failures")
+    return run
+
+
+def prune_ad_view_logs():
+    """
+    Deletes ad_view_logs rows older than the retention period in small batches.
+
+    Rows of days not yet folded into ad_daily_stats are kept.
+    """
+    if AD_VIEW_LOG_RETENTION_DAYS <= 0:
+        return
+    db = DatabaseConnection()
+    total = 0
+    while True:
+        with db.get_cursor() as cur:
+            cur.execute("""
+                DELETE FROM ad_view_logs
+                WHERE id IN (
+                    SELECT id FROM ad_view_logs
+                    WHERE viewed_at < CURRENT_DATE - %s
+                    AND viewed_at <= (SELECT folded_through FROM rollup_state WHERE name = %s)
+                    LIMIT %s
+                )
+            """, (AD_VIEW_LOG_RETENTION_DAYS, ROLLUP_NAME, PRUNE_BATCH_SIZE))
+            deleted = cur.rowcount
+        total += deleted
+        if deleted < PRUNE_BATCH_SIZE:
+            break
+    logging.info(f"Pruned {total} ad_view_logs rows older than {AD_VIEW_LOG_RETENTION_DAYS} days")
+
+
+def warm_up(handlers):
+    """
+    Preloads caches before the bot starts taking updates, then marks it ready.
+
+    Loads the active ad catalog, the languages and the ad rotation state of
+    recently active chats (one query each per tenant). Failures are logged and the bot starts anyway with cold
+    caches rather than not at all.
+
+    Args:
+        handlers (ButtonHandlers): Handlers owning the language cache
+    """
+    start = time.perf_counter()
+    details = {}
+    for tenant in TENANTS:
+        with use_tenant(tenant):
+            try:
+                AdCatalog().refresh()
+                details[f"{tenant.name}.ads"] = len(AdCatalog().ads)
+            except Exception as e:
+                logging.error(f"Warm-up: failed to load ad catalog for {tenant.name}: {e}")
+            try:
+                details[f"{tenant.name}.languages"] = handlers.preload_languages(WARM_ACTIVE_DAYS)
+            except Exception as e:
+                logging.error(f"Warm-up: failed to preload languages for {tenant.name}: {e}")
+            try:
+                details[f"{tenant.name}.ad_rotation"] = AdRotation().load(WARM_ACTIVE_DAYS)
+            except Exception as e:
+                logging.error(f"Warm-up: failed to load ad rotation state for {tenant.name}: {e}")
+    duration_ms = (time.perf_counter() - start) * 1000
+    Metrics().observe('startup.warmup_ms', duration_ms)
+    details['duration_ms'] = round(duration_ms, 1)
+    Readiness().mark_ready(**details)
+    logging.info(f"Warm-up finished: {details}")
+
+
+def compact_points():
+    """Folds sharded point counters back into the points rows."""
+    with DatabaseConnection().get_cursor() as cur:
+        compacted = PointsStore().compact(cur)
+    logging.info(f"Compacted point shards of {compacted} owners")
+
+
+def register_default_jobs(scheduler: Scheduler, handlers):
+    """
+    Registers the bot's maintenance jobs.
+
+    Intervals come from JOB_<NAME>_INTERVAL (seconds, 0 disables). Jobs that
+    touch the database or walk large object graphs run in worker threads.
+
+    Args:
+        scheduler (Scheduler): Scheduler to register the jobs on
+        handlers (ButtonHandlers): Handlers owning the caches and daily state
+    """
+    scheduler.add_job(Job(
+        'refresh_ads', in_worker_thread(AdCatalog().refresh_all),
+        interval=_interval('refresh_ads', '60'), jitter=JITTER
+    ))
+    scheduler.add_job(Job(
+        'daily_rollover', handlers.reset_daily_state,
+        daily_at=dtime(0, 0), timezone=DAILY_ROLLOVER_TZ
+    ))
+    scheduler.add_job(Job(
+        'prune_ad_view_logs', for_each_schema(prune_ad_view_logs),
+        interval=_interval('prune_ad_view_logs', '86400'), jitter=JITTER * 60
+    ))
+    if ARCHIVE_AFTER_DAYS > 0:
+        scheduler.add_job(Job(
+            'archive_ad_view_logs', for_each_schema(archive_ad_view_logs),
+            interval=_interval('archive_ad_view_logs', '86400'), jitter=JITTER * 60
+        ))
+    scheduler.add_job(Job(
+        'warm_caches', for_each_schema(lambda: handlers.preload_languages(WARM_ACTIVE_DAYS)),
+        interval=_interval('warm_caches', '3600'), jitter=JITTER
+    ))
+    scheduler.add_job(Job(
+        'rollup_ad_stats', for_each_schema(update_ad_daily_stats),
+        interval=_interval('rollup_ad_stats', '3600'), jitter=JITTER
+    ))
+    scheduler.add_job(Job(
+        'flush_ad_rotation', for_each_schema(AdRotation().flush),
+        interval=_interval('flush_ad_rotation', '60'), jitter=JITTER
+    ))
+    if PointsStore().sharded:
+        scheduler.add_job(Job(
+            'compact_points', for_each_schema(compact_points),
+            interval=_interval('compact_points', '60'), jitter=JITTER
+        ))
+    if IdempotencyStore().shared:
+        scheduler.add_job(Job(
+            'prune_idempotency_keys', for_each_schema(IdempotencyStore().prune),
+            interval=_interval('prune_idempotency_keys', '600'), jitter=JITTER
+        ))
+    if MemoryDiagnostics().enabled:
+        scheduler.add_job(Job(
+            'memory_report', in_worker_thread(MemoryDiagnostics().log_report),
+            interval=_interval('memory_report', '3600')
+        ))
+    scheduler.add_job(Job(
+        'report_metrics', Metrics().log_snapshot,
+        interval=_interval('report_metrics', '300')
+    ))
@@ -111,4 +111,24 @@ USER_GROUP_MESSAGES = {
     'group_success_register': "✅ Group registration completed successfully.",
     'group_already_exists': "ℹ️ This group is already registered.",
     'registration_error': "❌ An error occurred during registration. Please try again.",
-}
\ No newline at end of file
+}
+ADMIN_MESSAGES = {
+    'not_admin': "⛔ This command is only available to admins.",
+    'stats_header': "📊 Ad stats (last {days} days)",
+    'stats_row': "#{ad_id}: {impressions:,} views (user {user_impressions:,} / group {group_impressions:,}), {points_awarded:,} points",
+    'stats_empty': "📊 No ad views in the last {days} days.",
+    'stats_error': "❌ Error occurred while loading ad stats.",
+    'ad_usage': "Usage:\n/adadmin list\n/adadmin create <points> <weight> <url or -> <content>\n/adadmin activate <id>\n/adadmin deactivate <id>\n/adadmin weight <id> <1-100>\n/adadmin points <id> <points>\n/adadmin language <id> <ko|en|all>",
+    'ad_created': "✅ Ad #{ad_id} created.",
+    'ad_updated': "✅ Ad #{ad_id} updated.",
+    'ad_not_found': "❌ Ad #{ad_id} not found.",
+    'ad_invalid': "❌ Invalid value: {error}",
+    'ad_list_row': "#{ad_id} [{state}] {points} points, weight {weight}, {language}: {content}",
+    'ad_list_empty': "📢 No ads yet.",
+    'ad_error': "❌ Error occurred while updating ads.",
+}
+
+RATE_LIMIT_MESSAGES = {
+    'slow_down': "⏳ Too many requests. Please try again in a moment.",
+    'busy': "⏳ The bot is busy right now. Please try again shortly.",
+}
@@ -101,4 +101,24 @@ USER_GROUP_MESSAGES = {
     'group_success_register': "✅ 그룹 등록이 완료되었습니다.",
     'group_already_exists': "ℹ️ 이미 등록된 그룹입니다.",
     'registration_error': "❌ 등록 중 오류가 발생했습니다. 다시 시도해주세요."
-} 
\ No newline at end of file
+} 
+ADMIN_MESSAGES = {
+    'not_admin': "⛔ 관리자만 사용할 수 있는 명령어입니다.",
+    'stats_header': "📊 광고 통계 (최근 {days}일)",
+    'stats_row': "#{ad_id}: 조회 {impressions:,}회 (개인 {user_impressions:,} / 그룹 {group_impressions:,}), {points_awarded:,} 포인트",
+    'stats_empty': "📊 최근 {days}일 동안 광고 조회가 없습니다.",
+    'stats_error': "❌ 광고 통계를 불러오는 중 오류가 발생했습니다.",
+    'ad_usage': "사용법:\n/adadmin list\n/adadmin create <포인트> <가중치> <url 또는 -> <내용>\n/adadmin activate <id>\n/adadmin deactivate <id>\n/adadmin weight <id> <1-100>\n/adadmin points <id> <포인트>\n/adadmin language <id> <ko|en|all>",
+    'ad_created': "✅ 광고 #{ad_id} 이(가) 등록되었습니다.",
+    'ad_updated': "✅ 광고 #{ad_id} 이(가) 수정되었습니다.",
+    'ad_not_found': "❌ 광고 #{ad_id} 을(를) 찾을 수 없습니다.",
+    'ad_invalid': "❌ 잘못된 값입니다: {error}",
+    'ad_list_row': "#{ad_id} [{state}] {points} 포인트, 가중치 {weight}, {language}: {content}",
+    'ad_list_empty': "📢 등록된 광고가 없습니다.",
+    'ad_error': "❌ 광고를 수정하는 중 오류가 발생했습니다.",
+}
+
+RATE_LIMIT_MESSAGES = {
+    'slow_down': "⏳ 요청이 너무 많습니다. 잠시 후 다시 시도해주세요.",
+    'busy': "⏳ 지금 요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요.",
+}
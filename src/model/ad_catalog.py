@@ -0,0 +1,214 @@
+import asyncio
+import logging
+import time
+import psycopg2
+from psycopg2.extras import RealDictCursor
+from model.database import DEFAULT_SEARCH_PATH, DatabaseConnection
+from model.queries import AD_TENANT_FILTER
+from model.tenancy import TENANTS, current_tenant, use_tenant
+
+LANGUAGES = ('ko', 'en')
+# ads 변경 시 트리거가 보내는 NOTIFY 채널 (08_add_ad_points_weight.sql)
+NOTIFY_CHANNEL = 'ad_catalog'
+
+
+def _weighted(ads: list) -> list:
+    """
+    Repeats each ad weight times, spread evenly over the list, so a
+    round-robin walk shows ads in proportion to their weight.
+    """
+    entries = [
+        (k / ad['weight'], ad['id'], ad)
+        for ad in ads
+        for k in range(ad['weight'])
+    ]
+    entries.sort(key=lambda entry: entry[:2])
+    return [ad for _, _, ad in entries]
+
+
+class AdCatalog:
+    """
+    In-memory copy of the active ads, one list per tenant ad set.
+
+    Each ad set is also split into per-language pools: ads with a language
+    are only shown to chats using that language, ads without one to everyone.
+    Pools repeat each ad by its weight.
+
+    Kept current without an ads scan per press: a trigger bumps
+    ad_catalog_version and sends a NOTIFY on every change to ads, and an ad
+    set is only reloaded when its version moved.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(AdCatalog, cls).__new__(cls)
+            cls._instance._initialize()
+        return cls._instance
+
+    def _initialize(self):
+        self.db = DatabaseConnection()
+        # (schema, ad_tag) -> (ads, {language: weighted ads}, loaded_at)
+        self._catalogs = {}
+        # (schema, ad_tag) -> ad_catalog_version of the loaded ads
+        self._versions = {}
+
+    @staticmethod
+    def _key():
+        tenant = current_tenant()
+        return (tenant.schema, tenant.ad_tag)
+
+    @property
+    def ads(self) -> list:
+        return self._catalogs.get(self._key(), ([], {}, None))[0]
+
+    @property
+    def loaded(self) -> bool:
+        return self._key() in self._catalogs
+
+    def pool(self, language: str) -> list:
+        """
+        Active ads shown to chats using the given language, repeated by weight.
+
+        Args:
+            language (str): Language code ('ko' or 'en')
+
+        Returns:
+            list: Ad rows (all ads for unknown languages)
+        """
+        ads, pools, _ = self._catalogs.get(self._key(), ([], {}, None))
+        return pools.get(language, ads)
+
+    def _version(self, cur) -> int:
+        cur.execute("""
+            SELECT version FROM ad_catalog_version
+        """)
+        row = cur.fetchone()
+        return row['version'] if row else 0
+
+    def refresh(self, cur=None):
+        """
+        Reloads the current tenant's active ads from the database.
+
+        Args:
+            cur: RealDictCursor to read with (default: a read-only cursor from the pool)
+        """
+        if cur is None:
+            return self.db.read(self.refresh, cursor_factory=RealDictCursor)
+        ad_tag = current_tenant().ad_tag
+        # 버전을 먼저 읽으므로 그 사이에 바뀐 광고는 다음 확인에서 다시 읽힘
+        version = self._version(cur)
+        cur.execute(f"""
+            SELECT id, content, url, points, language, weight
+            FROM ads
+            WHERE is_active = TRUE AND {AD_TENANT_FILTER}
+            ORDER BY id
+        """, (ad_tag, ad_tag))
+        ads = [dict(row) for row in cur.fetchall()]
+        pools = {
+            language: _weighted([ad for ad in ads if ad['language'] in (None, language)])
+            for language in LANGUAGES
+        }
+        self._catalogs[self._key()] = (ads, pools, time.monotonic())
+        self._versions[self._key()] = version
+        logging.info(f"Ad catalog refreshed for {current_tenant().name}: {len(ads)} active ads (version {version})")
+
+    def refresh_if_changed(self, cur=None) -> bool:
+        """
+        Reloads the current tenant's ads if ad_catalog_version moved.
+
+        Args:
+            cur: RealDictCursor to read with (default: a read-only cursor from the pool)
+
+        Returns:
+            bool: True if the ads were reloaded
+        """
+        if cur is None:
+            return self.db.read(self.refresh_if_changed, cursor_factory=RealDictCursor)
+        if self.loaded and self._version(cur) == self._versions.get(self._key()):
+            return False
+        self.refresh(cur)
+        return True
+
+    def refresh_all(self):
+        """Reloads the ads of every configured tenant whose version moved."""
+        for tenant in TENANTS:
+            with use_tenant(tenant):
+                self.refresh_if_changed()
+
+
+class AdCatalogListener:
+    """
+    LISTENs for ad changes on a dedicated autocommit connection and refreshes
+    the affected tenants' catalogs right away, reading them on that same
+    connection so a notification never touches a handler's transaction.
+
+    The refresh_ads job still compares versions periodically, which covers
+    notifications missed while this connection was down.
+    """
+
+    def __init__(self, catalog: AdCatalog, retry_after: float = 30):
+        self.catalog = catalog
+        self.retry_after = retry_after
+        self.conn = None
+        self.loop = None
+        self.stopped = False
+
+    async def start(self):
+        """Opens the connection and starts listening (retries later on failure)."""
+        self.loop = asyncio.get_running_loop()
+        if self.stopped:
+            return
+        try:
+            self.conn = psycopg2.connect(**self.catalog.db.config)
+            self.conn.autocommit = True
+            with self.conn.cursor() as cur:
+                cur.execute(f"LISTEN {NOTIFY_CHANNEL}")
+            self.loop.add_reader(self.conn.fileno(), self._on_readable)
+            logging.info(f"Listening for ad catalog changes on {NOTIFY_CHANNEL}")
+        except Exception as e:
+            logging.error(f"Error starting ad catalog listener: {e}")
+            self._retry()
+
+    def _retry(self):
+        self._close()
+        self.loop.call_later(self.retry_after, lambda: self.loop.create_task(self.start()))
+
+    def _on_readable(self):
+        try:
+            self.conn.poll()
+        except Exception as e:
+            logging.error(f"Ad catalog listener connection lost: {e}")
+            self._retry()
+            return
+        schemas = {notify.payload for notify in self.conn.notifies}
+        self.conn.notifies.clear()
+        for tenant in TENANTS:
+            if (tenant.schema or 'public') not in schemas:
+                continue
+            with use_tenant(tenant):
+                try:
+                    with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
+                        cur.execute("""
+                            SELECT set_config('search_path', %s, false)
+                        """, (tenant.search_path or DEFAULT_SEARCH_PATH,))
+                        self.catalog.refresh_if_changed(cur)
+                except Exception as e:
+                    logging.error(f"Error refreshing ad catalog for {tenant.name}: {e}")
+
+    def _close(self):
+        if self.conn is None:
+            return
+        if not self.conn.closed:
+            try:
+                self.loop.remove_reader(self.conn.fileno())
+            except (ValueError, OSError):
+                pass
+            self.conn.close()
+        self.conn = None
+
+    async def stop(self):
+        """Stops listening and closes the connection."""
+        self.stopped = True
+        if self.loop is not None:
+            self._close()
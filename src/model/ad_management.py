@@ -0,0 +1,155 @@
+import argparse
+import logging
+from psycopg2.extras import RealDictCursor
+from model.database import DatabaseConnection
+from model.queries import AD_TENANT_FILTER
+from model.ad_catalog import LANGUAGES
+from model.tenancy import TENANTS, current_tenant, use_tenant
+
+MAX_WEIGHT = 100
+
+
+def _validate(points: int = None, weight: int = None, language: str = None):
+    if points is not None and points < 0:
+        raise ValueError("points must be 0 or more")
+    if weight is not None and not 1 <= weight <= MAX_WEIGHT:
+        raise ValueError(f"weight must be between 1 and {MAX_WEIGHT}")
+    if language is not None and language not in LANGUAGES:
+        raise ValueError(f"language must be one of {', '.join(LANGUAGES)}")
+
+
+def list_ads() -> list:
+    """
+    Lists the current tenant's ads, active or not.
+
+    Returns:
+        list: Ad rows (id, content, url, points, weight, language, is_active)
+    """
+    ad_tag = current_tenant().ad_tag
+
+    def fetch(cur):
+        cur.execute(f"""
+            SELECT id, content, url, points, weight, language, is_active
+            FROM ads
+            WHERE {AD_TENANT_FILTER}
+            ORDER BY id
+        """, (ad_tag, ad_tag))
+        return cur.fetchall()
+
+    return DatabaseConnection().read(fetch, cursor_factory=RealDictCursor)
+
+
+def create_ad(content: str, url: str = None, points: int = 10, weight: int = 1,
+              language: str = None, active: bool = True) -> int:
+    """
+    Creates an ad for the current tenant's ad set.
+
+    Args:
+        content (str): Ad text
+        url (str): Link shown as a button, or None
+        points (int): Points awarded per daily view
+        weight (int): Relative share of impressions (1-100)
+        language (str): Only show to chats using this language (None = all)
+        active (bool): Whether the ad is shown right away
+
+    Returns:
+        int: Id of the new ad
+    """
+    _validate(points, weight, language)
+    with DatabaseConnection().get_cursor() as cur:
+        cur.execute("""
+            INSERT INTO ads (content, url, points, weight, language, is_active, tenant)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            RETURNING id
+        """, (content, url, points, weight, language, active, current_tenant().ad_tag))
+        return cur.fetchone()[0]
+
+
+def update_ad(ad_id: int, **fields) -> bool:
+    """
+    Changes an ad of the current tenant's ad set.
+
+    Args:
+        ad_id (int): Ad id
+        **fields: Any of is_active, points, weight, language (None = all languages)
+
+    Returns:
+        bool: False if there is no such ad
+    """
+    allowed = ('is_active', 'points', 'weight', 'language')
+    unknown = set(fields) - set(allowed)
+    if unknown or not fields:
+        raise ValueError(f"Can only update {', '.join(allowed)}")
+    _validate(fields.get('points'), fields.get('weight'), fields.get('language'))
+
+    names = [name for name in allowed if name in fields]
+    ad_tag = current_tenant().ad_tag
+    with DatabaseConnection().get_cursor() as cur:
+        cur.execute(f"""
+            UPDATE ads
+            SET {', '.join(f'{name} = %s' for name in names)}
+            WHERE id = %s
+            AND {AD_TENANT_FILTER}
+        """, [fields[name] for name in names] + [ad_id, ad_tag, ad_tag])
+        return cur.rowcount > 0
+
+
+def main():
+    """
+    Command line entry point (run from src/):
+
+        python -m model.ad_management list
+        python -m model.ad_management create "New ad" --url https://example.com --points 10 --weight 2
+        python -m model.ad_management activate 3
+        python -m model.ad_management weight 3 5
+    """
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Manage ads (running bots pick up changes right away)")
+    parser.add_argument('--tenant', help="Tenant name (default: first configured tenant)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('list', help="List ads")
+    create_parser = subparsers.add_parser('create', help="Create an ad")
+    create_parser.add_argument('content')
+    create_parser.add_argument('--url')
+    create_parser.add_argument('--points', type=int, default=10)
+    create_parser.add_argument('--weight', type=int, default=1)
+    create_parser.add_argument('--language', choices=LANGUAGES)
+    create_parser.add_argument('--inactive', action='store_true', help="Create without showing it yet")
+    for command in ('activate', 'deactivate'):
+        subparsers.add_parser(command, help=f"{command.capitalize()} an ad").add_argument('ad_id', type=int)
+    for command in ('weight', 'points'):
+        value_parser = subparsers.add_parser(command, help=f"Set the {command} of an ad")
+        value_parser.add_argument('ad_id', type=int)
+        value_parser.add_argument('value', type=int)
+    language_parser = subparsers.add_parser('language', help="Set the language of an ad ('all' for every language)")
+    language_parser.add_argument('ad_id', type=int)
+    language_parser.add_argument('value', choices=LANGUAGES + ('all',))
+
+    args = parser.parse_args()
+    tenant = next((t for t in TENANTS if t.name == args.tenant), None) if args.tenant else current_tenant()
+    if tenant is None:
+        parser.error(f"Unknown tenant: {args.tenant}")
+
+    with use_tenant(tenant):
+        if args.command == 'list':
+            for ad in list_ads():
+                state = 'active' if ad['is_active'] else 'inactive'
+                print(f"#{ad['id']} [{state}] points={ad['points']} weight={ad['weight']} "
+                      f"language={ad['language'] or 'all'} {ad['content']} {ad['url'] or ''}")
+            return
+        if args.command == 'create':
+            ad_id = create_ad(args.content, args.url, args.points, args.weight, args.language, not args.inactive)
+            print(f"Created ad #{ad_id}")
+            return
+        if args.command in ('activate', 'deactivate'):
+            found = update_ad(args.ad_id, is_active=args.command == 'activate')
+        elif args.command == 'language':
+            found = update_ad(args.ad_id, language=None if args.value == 'all' else args.value)
+        else:
+            found = update_ad(args.ad_id, **{args.command: args.value})
+        print(f"Updated ad #{args.ad_id}" if found else f"Ad #{args.ad_id} not found")
+
+
+if __name__ == '__main__':
+    main()
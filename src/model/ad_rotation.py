@@ -0,0 +1,165 @@
+import logging
+import os
+import threading
+from datetime import date, datetime
+from psycopg2.extras import execute_values
+from dotenv import load_dotenv
+from model.database import DatabaseConnection
+from model.ad_catalog import AdCatalog
+from model.tenancy import current_tenant
+
+load_dotenv()
+
+# 상태 값 하나에 (로테이션 위치, 날짜, 오늘 노출 수) 를 비트로 묶어 저장
+_VIEW_BITS = 12
+_DAY_BITS = 20
+_VIEW_MASK = (1 << _VIEW_BITS) - 1
+_DAY_MASK = (1 << _DAY_BITS) - 1
+_POS_SHIFT = _VIEW_BITS + _DAY_BITS
+
+
+def _pack(position: int, day: int, views: int) -> int:
+    return (position << _POS_SHIFT) | ((day & _DAY_MASK) << _VIEW_BITS) | min(views, _VIEW_MASK)
+
+
+def _unpack(state: int) -> tuple:
+    return state >> _POS_SHIFT, (state >> _VIEW_BITS) & _DAY_MASK, state & _VIEW_MASK
+
+
+class AdRotation:
+    """
+    Picks the next ad for a chat from its language pool.
+
+    Each chat walks the pool round-robin from its own starting offset, so it
+    sees every ad (weight times) before any repeats, and different chats start
+    on different ads. AD_FREQUENCY_CAP limits how many rounds one chat goes
+    through per day, i.e. an ad is shown to it at most cap * weight times
+    (0 = unlimited). The state per chat is a single packed int kept
+    in memory; changed entries are written to ad_rotation_state by a periodic
+    job and at shutdown, and recent entries are loaded at warm-up.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(AdRotation, cls).__new__(cls)
+            cls._instance._initialize()
+        return cls._instance
+
+    def _initialize(self):
+        self.db = DatabaseConnection()
+        self.catalog = AdCatalog()
+        self.frequency_cap = int(os.getenv('AD_FREQUENCY_CAP', '3'))
+        # (tenant prefix, owner_type) -> {owner_id: packed state}
+        self._state = {}
+        # (tenant prefix, owner_type) -> owner_ids changed since the last flush
+        self._dirty = {}
+        # flush 는 작업 스레드에서 실행되므로 상태 변경을 직렬화
+        self._lock = threading.Lock()
+
+    def _today(self) -> int:
+        # ad_view_logs 와 같은 DB 날짜 기준으로 하루 노출 횟수를 셈
+        return datetime.now(self.db.timezone()).date().toordinal()
+
+    def _states(self, owner_type: str) -> dict:
+        return self._state.setdefault((current_tenant().cache_prefix, owner_type), {})
+
+    def next_ad(self, owner_type: str, owner_id: int, language: str) -> dict:
+        """
+        Returns the next ad for a chat and advances its rotation.
+
+        Args:
+            owner_type (str): 'user' or 'group'
+            owner_id (int): User or group id
+            language (str): Language of the chat
+
+        Returns:
+            dict: Ad row, or None if the pool is empty or the daily cap is reached
+        """
+        pool = self.catalog.pool(language)
+        if not pool:
+            return None
+        today = self._today()
+        with self._lock:
+            states = self._states(owner_type)
+            position, day, views = _unpack(states.get(owner_id, 0))
+            if day != today & _DAY_MASK:
+                views = 0
+            # 연속된 cap * len(pool) 번의 노출에서 각 광고는 정확히 cap * weight 번씩 노출됨
+            if self.frequency_cap and views >= self.frequency_cap * len(pool):
+                return None
+            # 채팅마다 다른 광고부터 시작하도록 id 로 시작 위치를 분산
+            offset = (owner_id * 2654435761) % len(pool)
+            ad = pool[(offset + position) % len(pool)]
+            states[owner_id] = _pack(position + 1, today, views + 1)
+            self._dirty.setdefault((current_tenant().cache_prefix, owner_type), set()).add(owner_id)
+        return ad
+
+    def load(self, active_days: int) -> int:
+        """
+        Loads the rotation state of recently active chats of the current tenant.
+
+        Entries already in memory are newer and kept.
+
+        Args:
+            active_days (int): Chats updated within this many days are loaded
+
+        Returns:
+            int: Number of entries loaded
+        """
+        def fetch(cur):
+            cur.execute("""
+                SELECT owner_type, owner_id, rotation_pos, view_day, views_today
+                FROM ad_rotation_state
+                WHERE updated_at >= CURRENT_DATE - %s
+            """, (active_days,))
+            return cur.fetchall()
+
+        rows = self.db.read(fetch)
+        with self._lock:
+            for owner_type, owner_id, position, view_day, views in rows:
+                day = view_day.toordinal() if view_day else 0
+                self._states(owner_type).setdefault(owner_id, _pack(position, day, views))
+        return len(rows)
+
+    def flush(self) -> int:
+        """
+        Writes the changed entries of the current tenant to ad_rotation_state.
+
+        Returns:
+            int: Number of entries written
+        """
+        prefix = current_tenant().cache_prefix
+        rows = []
+        with self._lock:
+            for (key_prefix, owner_type), owner_ids in list(self._dirty.items()):
+                if key_prefix != prefix:
+                    continue
+                states = self._states(owner_type)
+                for owner_id in owner_ids:
+                    position, day, views = _unpack(states[owner_id])
+                    rows.append((owner_type, owner_id, position, date.fromordinal(day) if day else None, views))
+                del self._dirty[(key_prefix, owner_type)]
+        if not rows:
+            return 0
+
+        try:
+            with self.db.get_cursor() as cur:
+                execute_values(cur, """
+                    INSERT INTO ad_rotation_state (owner_type, owner_id, rotation_pos, view_day, views_today)
+                    VALUES %s
+                    ON CONFLICT (owner_type, owner_id)
+                    DO UPDATE SET
+                        rotation_pos = EXCLUDED.rotation_pos,
+                        view_day = EXCLUDED.view_day,
+                        views_today = EXCLUDED.views_today,
+                        updated_at = now()
+                """, rows)
+        except Exception:
+            # 다음 flush 에서 다시 저장
+            with self._lock:
+                for owner_type, owner_id, _, _, _ in rows:
+                    self._dirty.setdefault((prefix, owner_type), set()).add(owner_id)
+            raise
+        logging.info(f"Flushed ad rotation state of {len(rows)} chats for {current_tenant().name}")
+        return len(rows)
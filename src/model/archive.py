@@ -0,0 +1,181 @@
+import argparse
+import glob
+import gzip
+import json
+import logging
+import os
+import sys
+from datetime import date
+from psycopg2.extras import RealDictCursor
+from dotenv import load_dotenv
+from model.database import DatabaseConnection
+from model.rollups import ROLLUP_NAME, update_ad_daily_stats
+from model.tenancy import current_tenant
+
+load_dotenv()
+
+ARCHIVE_DIR = os.getenv('ARCHIVE_DIR', 'archive')
+# 0이면 아카이브하지 않음
+ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', '0'))
+ARCHIVE_BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', '5000'))
+
+
+def _table_dir(directory: str) -> str:
+    """Archive directory of ad_view_logs for the current tenant schema."""
+    schema = current_tenant().schema or 'public'
+    return os.path.join(directory, schema, 'ad_view_logs')
+
+
+def _write_part(table_dir: str, month: str, rows: list) -> str:
+    """
+    Writes rows of one month to a new gzip NDJSON part file.
+
+    The file is written under a temporary name, fsynced and then renamed,
+    so a part either exists completely or not at all.
+
+    Returns:
+        str: Path of the written part
+    """
+    month_dir = os.path.join(table_dir, f"month={month}")
+    os.makedirs(month_dir, exist_ok=True)
+    path = os.path.join(month_dir, f"part-{rows[0]['id']}-{rows[-1]['id']}.ndjson.gz")
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as raw:
+        with gzip.GzipFile(fileobj=raw, mode='wb') as f:
+            for row in rows:
+                f.write((json.dumps(row, default=str) + '\n').encode('utf-8'))
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp_path, path)
+    return path
+
+
+def archive_ad_view_logs(older_than_days: int = None, directory: str = None,
+                         batch_size: int = None) -> int:
+    """
+    Moves ad_view_logs rows older than the given age to monthly archive files.
+
+    Rows are read in id order in batches, written to
+    <directory>/<schema>/ad_view_logs/month=YYYY-MM/part-<first>-<last>.ndjson.gz
+    and deleted only after their part file is on disk. Closed days are folded
+    into ad_daily_stats first, and only folded days are archived, so archiving
+    does not change the stats.
+
+    Args:
+        older_than_days (int): Minimum age in days (ARCHIVE_AFTER_DAYS by default)
+        directory (str): Archive root (ARCHIVE_DIR by default)
+        batch_size (int): Rows per batch (ARCHIVE_BATCH_SIZE by default)
+
+    Returns:
+        int: Number of rows archived
+    """
+    older_than_days = ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    batch_size = batch_size or ARCHIVE_BATCH_SIZE
+    if older_than_days <= 0:
+        return 0
+    table_dir = _table_dir(directory or ARCHIVE_DIR)
+    db = DatabaseConnection()
+
+    update_ad_daily_stats()
+
+    total = 0
+    last_id = 0
+    while True:
+        with db.get_cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("""
+                SELECT id, owner_type, owner_id, ad_id, viewed_at, points_earned
+                FROM ad_view_logs
+                WHERE viewed_at < CURRENT_DATE - %s AND id > %s
+                AND viewed_at <= (SELECT folded_through FROM rollup_state WHERE name = %s)
+                ORDER BY id
+                LIMIT %s
+            """, (older_than_days, last_id, ROLLUP_NAME, batch_size))
+            rows = [dict(row) for row in cur.fetchall()]
+        if not rows:
+            break
+
+        by_month = {}
+        for row in rows:
+            by_month.setdefault(row['viewed_at'].strftime('%Y-%m'), []).append(row)
+        for month, month_rows in by_month.items():
+            _write_part(table_dir, month, month_rows)
+
+        with db.get_cursor() as cur:
+            cur.execute("""
+                DELETE FROM ad_view_logs
+                WHERE id = ANY(%s)
+            """, ([row['id'] for row in rows],))
+
+        total += len(rows)
+        last_id = rows[-1]['id']
+
+    logging.info(f"Archived {total} ad_view_logs rows older than {older_than_days} days to {table_dir}")
+    return total
+
+
+def read_archived_ad_view_logs(directory: str = None, start_month: str = None,
+                               end_month: str = None, schema: str = 'public'):
+    """
+    Iterates archived ad_view_logs rows for reports.
+
+    A part can be written twice if the process stopped between writing it and
+    deleting its rows, so rows are de-duplicated by id within each month.
+
+    Args:
+        directory (str): Archive root (ARCHIVE_DIR by default)
+        start_month (str): First month to read, 'YYYY-MM' (inclusive)
+        end_month (str): Last month to read, 'YYYY-MM' (inclusive)
+        schema (str): Tenant schema whose archive to read
+
+    Yields:
+        dict: Archived row with viewed_at as a date
+    """
+    table_dir = os.path.join(directory or ARCHIVE_DIR, schema, 'ad_view_logs')
+    for month_dir in sorted(glob.glob(os.path.join(table_dir, 'month=*'))):
+        month = month_dir.rsplit('=', 1)[-1]
+        if (start_month and month < start_month) or (end_month and month > end_month):
+            continue
+        seen = set()
+        for path in sorted(glob.glob(os.path.join(month_dir, 'part-*.ndjson.gz'))):
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    row = json.loads(line)
+                    if row['id'] in seen:
+                        continue
+                    seen.add(row['id'])
+                    row['viewed_at'] = date.fromisoformat(row['viewed_at'])
+                    yield row
+
+
+def main():
+    """
+    Command line entry point (run from src/):
+
+        python -m model.archive archive --days 180
+        python -m model.archive read --from 2024-01 --to 2024-03
+    """
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Archive and read cold ad_view_logs rows")
+    parser.add_argument('--dir', default=ARCHIVE_DIR, help="Archive root directory")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    archive_parser = subparsers.add_parser('archive', help="Move old rows to archive files")
+    archive_parser.add_argument('--days', type=int, default=ARCHIVE_AFTER_DAYS, help="Minimum age in days")
+    archive_parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE)
+
+    read_parser = subparsers.add_parser('read', help="Print archived rows as NDJSON")
+    read_parser.add_argument('--from', dest='start_month', help="First month, YYYY-MM")
+    read_parser.add_argument('--to', dest='end_month', help="Last month, YYYY-MM")
+    read_parser.add_argument('--schema', default='public')
+
+    args = parser.parse_args()
+    if args.command == 'archive':
+        archived = archive_ad_view_logs(args.days, args.dir, args.batch_size)
+        print(f"Archived {archived} rows")
+    else:
+        for row in read_archived_ad_view_logs(args.dir, args.start_month, args.end_month, args.schema):
+            sys.stdout.write(json.dumps(row, default=str) + '\n')
+
+
+if __name__ == '__main__':
+    main()
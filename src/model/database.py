@@ -1,11 +1,109 @@
+import contextvars
+import logging
 import os
+import threading
+import time
+import weakref
 import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
 from contextlib import contextmanager
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from dotenv import load_dotenv
+from monitoring.tracing import Tracer, traced_cursor_factory
+from model.tenancy import current_tenant
 
 load_dotenv()
 
+DEFAULT_SEARCH_PATH = '"$user", public'
+
+# 현재 handler의 deadline (time.monotonic() 기준)
+_deadline = contextvars.ContextVar('db_deadline', default=None)
+
+
+class DatabaseUnavailable(Exception):
+    """Raised instead of touching the database while the circuit breaker is open."""
+
+
+class DeadlineExceeded(DatabaseUnavailable):
+    """Raised when the current handler's deadline has already passed."""
+
+
+class ReplicaUnavailable(psycopg2.OperationalError):
+    """Raised when the replica connection fails during a read (see DatabaseConnection.read)."""
+
+
+@contextmanager
+def deadline(seconds: float):
+    """
+    Sets a deadline for database access in the current context.
+
+    A deadline that is already active is never extended.
+
+    Args:
+        seconds (float): Time budget from now
+    """
+    until = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(until if current is None else min(current, until))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> float:
+    """Seconds left before the current deadline, or None if there is none."""
+    until = _deadline.get()
+    return None if until is None else until - time.monotonic()
+
+
+class CircuitBreaker:
+    """
+    Opens after consecutive database failures and short-circuits calls until
+    the cool-down passes; then one trial call is let through (half-open).
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None and time.monotonic() - self.opened_at < self.reset_timeout
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        if not self.is_open:
+            # half-open: 다음 실패 시 바로 다시 열림
+            self.opened_at = None
+            self.failures = self.failure_threshold - 1
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.failure_threshold and self.opened_at is None:
+            logging.error(f"Database circuit breaker opened for {self.reset_timeout}s after {self.failures} failures")
+            self.opened_at = time.monotonic()
+
+
 class DatabaseConnection:
+    """
+    Connection pools for the primary and the optional read replica.
+
+    Every get_cursor block checks out its own connection and returns it
+    afterwards, so handlers of different tenants (and jobs running in worker
+    threads) never share a transaction. Keep Bot API calls outside
+    get_cursor blocks so connections are not held across awaits.
+    """
     _instance = None
     
     def __new__(cls):
@@ -20,28 +118,298 @@ class DatabaseConnection:
             'user': os.getenv('POSTGRES_USER'),
             'password': os.getenv('POSTGRES_PASSWORD'),
             'host': os.getenv('POSTGRES_HOST'),
-            'port': os.getenv('POSTGRES_PORT', '5432')
+            'port': os.getenv('POSTGRES_PORT', '5432'),
+            'connect_timeout': int(os.getenv('POSTGRES_CONNECT_TIMEOUT', '3'))
         }
-        self.conn = None
+        self.pool_min = int(os.getenv('POSTGRES_POOL_MIN', '1'))
+        self.pool_max = int(os.getenv('POSTGRES_POOL_MAX', '10'))
+        self.pool = None
+        self._pool_lock = threading.Lock()
+        self.statement_timeout_ms = int(os.getenv('POSTGRES_STATEMENT_TIMEOUT_MS', '5000'))
+        self.config['options'] = f"-c statement_timeout={self.statement_timeout_ms}"
+        self.breaker = CircuitBreaker(
+            failure_threshold=int(os.getenv('DB_BREAKER_FAILURES', '5')),
+            reset_timeout=float(os.getenv('DB_BREAKER_RESET_SECONDS', '30'))
+        )
+
+        # 읽기 전용 쿼리를 보낼 replica (없으면 primary 사용)
+        self.replica_dsn = os.getenv('POSTGRES_REPLICA_DSN')
+        self.replica_max_lag = float(os.getenv('POSTGRES_REPLICA_MAX_LAG', '5'))
+        self.replica_lag_check_interval = float(os.getenv('POSTGRES_REPLICA_LAG_CHECK_INTERVAL', '10'))
+        self.replica_retry_after = float(os.getenv('POSTGRES_REPLICA_RETRY_AFTER', '30'))
+        self.pin_seconds = float(os.getenv('POSTGRES_READ_YOUR_WRITES_SECONDS', '10'))
+        self.replica_pool = None
+        # replica connection -> 마지막으로 설정한 session 값 (autocommit 이라 세션에 남음)
+        self._replica_settings = weakref.WeakKeyDictionary()
+        self._replica_down_until = 0.0
+        self._replica_lag_checked_at = 0.0
+        self._replica_lagging = False
+        # pin_key -> 이 시각까지 primary에서 읽음 (read-your-writes)
+        self._pinned = {}
+        self._timezone = None
+    
+    def _primary_pool(self):
+        with self._pool_lock:
+            if self.pool is None or self.pool.closed:
+                self.pool = psycopg2.pool.ThreadedConnectionPool(self.pool_min, self.pool_max, **self.config)
+            return self.pool
     
-    def connect(self):
-        if self.conn is None or self.conn.closed:
-            self.conn = psycopg2.connect(**self.config)
-        return self.conn
+    def _replica_pool(self):
+        with self._pool_lock:
+            if self.replica_pool is None or self.replica_pool.closed:
+                self.replica_pool = psycopg2.pool.ThreadedConnectionPool(
+                    self.pool_min, self.pool_max, self.replica_dsn,
+                    connect_timeout=self.config['connect_timeout'],
+                    options=self.config['options']
+                )
+            return self.replica_pool
+    
+    def _checkout(self, pool):
+        """Takes a connection from the pool; raises DatabaseUnavailable when all are in use."""
+        try:
+            return pool.getconn()
+        except psycopg2.pool.PoolError as e:
+            raise DatabaseUnavailable(f"No free database connection: {e}") from e
+    
+    def _checkout_replica(self):
+        conn = self._checkout(self._replica_pool())
+        if conn not in self._replica_settings:
+            conn.set_session(readonly=True, autocommit=True)
+            self._replica_settings[conn] = {
+                'statement_timeout': self.statement_timeout_ms,
+                'search_path': DEFAULT_SEARCH_PATH
+            }
+        return conn
+    
+    def _release(self, pool, conn, broken: bool = False):
+        """Returns a connection to its pool (closing it if broken or the pool was closed meanwhile)."""
+        if pool.closed:
+            if not conn.closed:
+                conn.close()
+            return
+        pool.putconn(conn, close=broken or bool(conn.closed))
     
     def close(self):
-        if self.conn and not self.conn.closed:
-            self.conn.close()
+        with self._pool_lock:
+            for pool in (self.pool, self.replica_pool):
+                if pool is not None and not pool.closed:
+                    pool.closeall()
+    
+    def timezone(self) -> ZoneInfo:
+        """
+        Time zone the primary's CURRENT_DATE is computed in (read once).
+        
+        Returns:
+            ZoneInfo: Session TimeZone of the primary, UTC if it is not an IANA name
+        """
+        if self._timezone is None:
+            with self.get_cursor() as cur:
+                cur.execute("SELECT current_setting('TimeZone')")
+                name = cur.fetchone()[0]
+            try:
+                self._timezone = ZoneInfo(name)
+            except (ZoneInfoNotFoundError, ValueError):
+                logging.warning(f"Unknown database time zone {name!r}, assuming UTC")
+                self._timezone = ZoneInfo('UTC')
+        return self._timezone
+    
+    def available(self) -> bool:
+        """False while the circuit breaker is open or the current deadline has passed."""
+        left = remaining_time()
+        return not self.breaker.is_open and (left is None or left > 0)
+    
+    def _statement_timeout_ms(self) -> int:
+        """Default statement timeout, shortened to the time left before the deadline."""
+        left = remaining_time()
+        if left is None:
+            return self.statement_timeout_ms
+        if left <= 0:
+            raise DeadlineExceeded("Handler deadline exceeded")
+        return max(1, min(self.statement_timeout_ms, int(left * 1000)))
+    
+    def _apply_session_settings(self, conn, cursor, timeout_ms: int):
+        """
+        Applies the per-cursor settings in at most one round trip:
+        a statement_timeout tightened by the handler deadline and the current
+        tenant's search_path.
+        
+        Defaults are set once per connection (options at connect time).
+        Transactions use SET LOCAL semantics; the autocommit replica session
+        keeps its last values, so they are only sent when they change.
+        """
+        search_path = current_tenant().search_path
+        settings = []
+        if conn.autocommit:
+            search_path = search_path or DEFAULT_SEARCH_PATH
+            current = self._replica_settings[conn]
+            if timeout_ms != current['statement_timeout']:
+                settings.append(('statement_timeout', str(timeout_ms)))
+            if search_path != current['search_path']:
+                settings.append(('search_path', search_path))
+            self._replica_settings[conn] = {'statement_timeout': timeout_ms, 'search_path': search_path}
+        else:
+            if timeout_ms < self.statement_timeout_ms:
+                settings.append(('statement_timeout', str(timeout_ms)))
+            if search_path:
+                settings.append(('search_path', search_path))
+        if settings:
+            is_local = not conn.autocommit
+            cursor.execute(
+                "SELECT " + ", ".join("set_config(%s, %s, %s)" for _ in settings),
+                [value for name, setting in settings for value in (name, setting, is_local)]
+            )
+    
+    def _mark_replica_down(self, error: Exception):
+        logging.warning(f"Replica unavailable, reading from primary for {self.replica_retry_after}s: {error}")
+        self._replica_down_until = time.monotonic() + self.replica_retry_after
+        # 남은 연결도 끊겼을 수 있으므로 pool 을 통째로 닫음 (사용 중인 연결은 반납 시 닫힘)
+        with self._pool_lock:
+            if self.replica_pool is not None and not self.replica_pool.closed:
+                self.replica_pool.closeall()
+            self.replica_pool = None
+    
+    def _replica_is_lagging(self, conn) -> bool:
+        """Checks replication lag at most once per lag-check interval."""
+        now = time.monotonic()
+        if now - self._replica_lag_checked_at >= self.replica_lag_check_interval:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+                """)
+                lag = float(cur.fetchone()[0])
+            self._replica_lagging = lag > self.replica_max_lag
+            self._replica_lag_checked_at = now
+            if self._replica_lagging:
+                logging.warning(f"Replica lag {lag:.1f}s exceeds {self.replica_max_lag}s, reading from primary")
+        return self._replica_lagging
+    
+    def _is_pinned(self, pin_key) -> bool:
+        if pin_key is None:
+            return False
+        until = self._pinned.get(pin_key)
+        if until is None:
+            return False
+        if until < time.monotonic():
+            del self._pinned[pin_key]
+            return False
+        return True
+    
+    def _pin(self, pin_key):
+        now = time.monotonic()
+        self._pinned[pin_key] = now + self.pin_seconds
+        # 만료된 항목 정리
+        if len(self._pinned) > 10000:
+            self._pinned = {k: v for k, v in self._pinned.items() if v >= now}
+    
+    def _read_connection(self, pin_key=None):
+        """
+        Checks out the connection for a read-only statement.
+        
+        Uses the replica unless none is configured, it recently failed, it lags
+        behind, or the chat identified by pin_key wrote within the pin window.
+        
+        Returns:
+            tuple: (pool, connection, role) where role is 'replica' or 'primary'
+        """
+        if (self.replica_dsn
+                and time.monotonic() >= self._replica_down_until
+                and not self._is_pinned(pin_key)):
+            pool = conn = None
+            try:
+                pool = self._replica_pool()
+                conn = self._checkout_replica()
+                if not self._replica_is_lagging(conn):
+                    return pool, conn, 'replica'
+                self._release(pool, conn)
+            except psycopg2.Error as e:
+                if conn is not None:
+                    self._release(pool, conn, broken=True)
+                self._mark_replica_down(e)
+        pool = self._primary_pool()
+        return pool, self._checkout(pool), 'primary'
     
     @contextmanager
-    def get_cursor(self, cursor_factory=None):
-        conn = self.connect()
-        cursor = conn.cursor(cursor_factory=cursor_factory)
+    def get_cursor(self, cursor_factory=None, readonly=False, pin_key=None):
+        """
+        Yields a cursor and commits on success, rolls back on error.
+        
+        Each statement is bounded by statement_timeout (shortened to the current
+        handler deadline); a cancelled statement is rolled back and its healthy
+        connection returned to the pool without counting as a failure.
+        Raises DatabaseUnavailable without touching the
+        database while the circuit breaker is open or the deadline has passed.
+        
+        Args:
+            cursor_factory: Optional psycopg2 cursor class
+            readonly (bool): Statements only read; may be served by the replica
+            pin_key: Chat identifier. Writes pin it to the primary for a short
+                window so its next reads see them; reads honour the pin.
+        """
+        timeout_ms = self._statement_timeout_ms()
+        if not self.breaker.allow():
+            raise DatabaseUnavailable("Database circuit breaker is open")
+        tracer = Tracer()
+        if tracer.active:
+            cursor_factory = traced_cursor_factory(cursor_factory or psycopg2.extensions.cursor)
+        try:
+            if readonly:
+                pool, conn, role = self._read_connection(pin_key)
+            else:
+                pool = self._primary_pool()
+                conn, role = self._checkout(pool), 'primary'
+        except psycopg2.OperationalError:
+            self.breaker.record_failure()
+            raise
+        broken = False
+        with tracer.span('db.cursor', role=role):
+            cursor = conn.cursor(cursor_factory=cursor_factory)
+            try:
+                self._apply_session_settings(conn, cursor, timeout_ms)
+                yield cursor
+                conn.commit()
+            except Exception as e:
+                # statement_timeout 에 의한 취소 (deadline 으로 줄어든 경우 포함) 는 연결 문제가 아님
+                canceled = isinstance(e, psycopg2.extensions.QueryCanceledError)
+                if conn.closed or (isinstance(e, psycopg2.OperationalError) and not canceled):
+                    broken = True
+                    if role == 'replica':
+                        self._mark_replica_down(e)
+                    else:
+                        self.breaker.record_failure()
+                if not conn.closed:
+                    try:
+                        conn.rollback()
+                    except psycopg2.Error:
+                        broken = True
+                if broken and role == 'replica':
+                    raise ReplicaUnavailable(str(e)) from e
+                raise e
+            finally:
+                cursor.close()
+                self._release(pool, conn, broken)
+            self.breaker.record_success()
+            if not readonly and pin_key is not None and self.replica_dsn:
+                self._pin(pin_key)
+    
+    def read(self, func, cursor_factory=None, pin_key=None):
+        """
+        Runs a read on a read-only cursor and returns its result.
+        
+        If the replica connection fails while the read runs, the replica is
+        marked down and the read is run once more, now on the primary.
+        
+        Args:
+            func: Called with the cursor; does all statements of the read
+            cursor_factory: Optional psycopg2 cursor class
+            pin_key: Chat identifier (see get_cursor)
+            
+        Returns:
+            The value returned by func
+        """
         try:
-            yield cursor
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            raise e
-        finally:
-            cursor.close()
+            with self.get_cursor(cursor_factory=cursor_factory, readonly=True, pin_key=pin_key) as cur:
+                return func(cur)
+        except ReplicaUnavailable as e:
+            logging.warning(f"Read failed on replica, retrying on primary: {e}")
+            with self.get_cursor(cursor_factory=cursor_factory, readonly=True, pin_key=pin_key) as cur:
+                return func(cur)
@@ -0,0 +1,123 @@
+import logging
+import os
+import time
+from collections import OrderedDict
+from psycopg2.extras import execute_values
+from dotenv import load_dotenv
+from model.database import DatabaseConnection
+
+load_dotenv()
+
+
+class IdempotencyStore:
+    """
+    Remembers recently handled deliveries so duplicates are not handled again.
+
+    Keys live for a TTL in a bounded in-memory map (oldest entries are evicted
+    first). With IDEMPOTENCY_BACKEND=postgres, keys are also claimed in the
+    idempotency_keys table, so several bot processes share them; if the
+    database cannot be reached the in-memory answer is used.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(IdempotencyStore, cls).__new__(cls)
+            cls._instance._initialize()
+        return cls._instance
+
+    def _initialize(self):
+        self.db = DatabaseConnection()
+        self.ttl = float(os.getenv('IDEMPOTENCY_TTL_SECONDS', '600'))
+        self.max_entries = int(os.getenv('IDEMPOTENCY_MAX_ENTRIES', '10000'))
+        self.shared = os.getenv('IDEMPOTENCY_BACKEND', 'memory') == 'postgres'
+        # key -> expires_at (monotonic)
+        self._keys = OrderedDict()
+
+    def _evict(self, now: float):
+        while self._keys:
+            key, expires_at = next(iter(self._keys.items()))
+            if expires_at > now and len(self._keys) <= self.max_entries:
+                break
+            del self._keys[key]
+
+    def _seen(self, key: str, now: float) -> bool:
+        expires_at = self._keys.get(key)
+        return expires_at is not None and expires_at > now
+
+    def _claim_shared(self, keys: list) -> bool:
+        """Claims keys in idempotency_keys; False if any of them is still live there."""
+        with self.db.get_cursor() as cur:
+            claimed = execute_values(cur, """
+                INSERT INTO idempotency_keys (key, expires_at)
+                VALUES %s
+                ON CONFLICT (key)
+                DO UPDATE SET expires_at = EXCLUDED.expires_at
+                WHERE idempotency_keys.expires_at < now()
+                RETURNING key
+            """, keys, template="(%s, now() + %s * interval '1 second')", fetch=True)
+        return len(claimed) == len(keys)
+
+    def claim(self, keys: list) -> bool:
+        """
+        Claims the keys of one delivery.
+
+        Args:
+            keys (list): (key, ttl seconds) pairs; ttl None uses IDEMPOTENCY_TTL_SECONDS
+
+        Returns:
+            bool: True if none of the keys was seen within its TTL (handle the delivery)
+        """
+        now = time.monotonic()
+        keys = [(key, self.ttl if ttl is None else ttl) for key, ttl in keys]
+        if any(self._seen(key, now) for key, _ in keys):
+            return False
+
+        claimed = True
+        if self.shared:
+            try:
+                claimed = self._claim_shared(keys)
+            except Exception as e:
+                logging.error(f"Error claiming idempotency keys: {e}")
+
+        for key, ttl in keys:
+            self._keys[key] = now + ttl
+            self._keys.move_to_end(key)
+        self._evict(now)
+        return claimed
+
+    def release(self, keys: list):
+        """
+        Forgets the keys of a delivery that failed, so a retry is handled.
+
+        Args:
+            keys (list): (key, ttl seconds) pairs passed to claim()
+        """
+        names = [key for key, _ in keys]
+        for key in names:
+            self._keys.pop(key, None)
+        if self.shared:
+            try:
+                with self.db.get_cursor() as cur:
+                    cur.execute("""
+                        DELETE FROM idempotency_keys
+                        WHERE key = ANY(%s)
+                    """, (names,))
+            except Exception as e:
+                logging.error(f"Error releasing idempotency keys: {e}")
+
+    def prune(self) -> int:
+        """
+        Deletes expired keys from idempotency_keys (shared backend only).
+
+        Returns:
+            int: Number of keys deleted
+        """
+        if not self.shared:
+            return 0
+        with self.db.get_cursor() as cur:
+            cur.execute("""
+                DELETE FROM idempotency_keys
+                WHERE expires_at < now()
+            """)
+            return cur.rowcount
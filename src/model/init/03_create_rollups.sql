@@ -0,0 +1,34 @@
+CREATE TABLE IF NOT EXISTS ad_daily_stats (
+    ad_id BIGINT 
+        NOT NULL,
+    day DATE 
+        NOT NULL,
+    owner_type VARCHAR(10) 
+        CHECK (owner_type IN ('user', 'group')),
+    impressions INTEGER 
+        NOT NULL DEFAULT 0,
+    points_awarded BIGINT 
+        NOT NULL DEFAULT 0,
+    PRIMARY KEY (ad_id, day, owner_type)
+);
+
+CREATE INDEX IF NOT EXISTS idx_ad_daily_stats_day
+ON ad_daily_stats (day);
+
+-- ad_daily_stats 에 반영이 끝난 마지막 날짜 (day watermark, NULL 이면 아직 없음)
+-- 그 이후의 날짜는 ad_view_logs 에서 직접 집계함
+CREATE TABLE IF NOT EXISTS rollup_state (
+    name TEXT 
+        PRIMARY KEY,
+    folded_through DATE,
+    updated_at TIMESTAMP 
+        DEFAULT now()
+);
+
+INSERT INTO rollup_state (name)
+VALUES ('ad_daily_stats')
+ON CONFLICT (name) DO NOTHING;
+
+-- 롤업과 /adstats 의 실시간 집계는 ad_view_logs 를 날짜 범위로 읽음
+CREATE INDEX IF NOT EXISTS idx_ad_view_logs_viewed_at
+ON ad_view_logs (viewed_at);
@@ -0,0 +1,13 @@
+-- POINTS_SHARDS > 1 일 때 사용하는 포인트 sub-counter
+-- 잔액 = points.point + SUM(point_shards.delta)
+CREATE TABLE IF NOT EXISTS point_shards (
+    owner_type TEXT 
+        CHECK (owner_type IN ('user', 'group')),
+    owner_id BIGINT 
+        NOT NULL,
+    shard SMALLINT 
+        NOT NULL,
+    delta BIGINT 
+        NOT NULL DEFAULT 0,
+    PRIMARY KEY (owner_type, owner_id, shard)
+);
@@ -0,0 +1,7 @@
+-- 여러 브랜드 봇이 같은 테이블을 공유할 때 광고 세트를 구분 (NULL = 모든 tenant)
+ALTER TABLE ads
+ADD COLUMN IF NOT EXISTS tenant TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_ads_active_tenant
+ON ads (tenant)
+WHERE is_active = TRUE;
@@ -0,0 +1,20 @@
+-- 광고 언어 (NULL = 모든 언어)
+ALTER TABLE ads
+ADD COLUMN IF NOT EXISTS language TEXT 
+    CHECK (language IN ('ko', 'en'));
+
+-- 채팅별 광고 로테이션 위치와 오늘 노출 횟수 (메모리 상태를 주기적으로 저장)
+CREATE TABLE IF NOT EXISTS ad_rotation_state (
+    owner_type TEXT 
+        CHECK (owner_type IN ('user', 'group')),
+    owner_id BIGINT 
+        NOT NULL,
+    rotation_pos BIGINT 
+        NOT NULL DEFAULT 0,
+    view_day DATE,
+    views_today INT 
+        NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP 
+        DEFAULT now(),
+    PRIMARY KEY (owner_type, owner_id)
+);
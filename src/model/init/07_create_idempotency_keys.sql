@@ -0,0 +1,10 @@
+-- IDEMPOTENCY_BACKEND=postgres 일 때 여러 프로세스가 공유하는 중복 처리 방지 키
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    key TEXT 
+        PRIMARY KEY,
+    expires_at TIMESTAMP 
+        NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_expires_at
+ON idempotency_keys (expires_at);
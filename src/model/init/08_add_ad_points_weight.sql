@@ -0,0 +1,40 @@
+-- 광고별 지급 포인트와 노출 가중치 (봇이 읽던 ads.points 컬럼이 없었음)
+ALTER TABLE ads
+ADD COLUMN IF NOT EXISTS points INT 
+    NOT NULL DEFAULT 10 
+    CHECK (points >= 0);
+
+ALTER TABLE ads
+ADD COLUMN IF NOT EXISTS weight INT 
+    NOT NULL DEFAULT 1 
+    CHECK (weight BETWEEN 1 AND 100);
+
+-- ads 가 바뀔 때마다 증가하는 버전 (봇은 이 값이 바뀐 경우에만 광고 목록을 다시 읽음)
+CREATE TABLE IF NOT EXISTS ad_catalog_version (
+    id BOOLEAN 
+        PRIMARY KEY DEFAULT TRUE 
+        CHECK (id),
+    version BIGINT 
+        NOT NULL DEFAULT 0
+);
+
+INSERT INTO ad_catalog_version (id, version)
+VALUES (TRUE, 0)
+ON CONFLICT (id) DO NOTHING;
+
+-- 버전을 올리고 실행 중인 봇에 NOTIFY (payload = 스키마 이름)
+-- 함수는 호출한 세션의 search_path 로 실행되므로 트리거가 걸린 테이블의 스키마를 명시함
+CREATE OR REPLACE FUNCTION bump_ad_catalog_version()
+RETURNS trigger AS $$
+BEGIN
+    EXECUTE format('UPDATE %I.ad_catalog_version SET version = version + 1', TG_TABLE_SCHEMA);
+    PERFORM pg_notify('ad_catalog', TG_TABLE_SCHEMA);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS ads_catalog_changed ON ads;
+CREATE TRIGGER ads_catalog_changed
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON ads
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_ad_catalog_version();
@@ -0,0 +1,122 @@
+import os
+import random
+from dotenv import load_dotenv
+from model.queries import run_query
+
+load_dotenv()
+
+
+class PointsStore:
+    """
+    Reads and updates point balances.
+
+    With POINTS_SHARDS > 1, credits are spread over that many sub-counter rows in
+    point_shards instead of the single points row, so concurrent credits for one
+    owner do not queue on the same row lock. The balance is points.point plus
+    the sum of its shards; compact() periodically folds shards back into points.
+    Debits always fold the owner's shards first and then update points, so a
+    claim sees the full balance. As in single-row mode, only owners with a
+    points row (registered with /start) are credited.
+
+    All methods take the caller's cursor and run inside its transaction.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(PointsStore, cls).__new__(cls)
+            cls._instance._initialize()
+        return cls._instance
+
+    def _initialize(self):
+        self.shards = int(os.getenv('POINTS_SHARDS', '0'))
+
+    @property
+    def sharded(self) -> bool:
+        return self.shards > 1
+
+    def _fetch_value(self, cur):
+        """Reads the first column of the next row for both tuple and dict cursors."""
+        row = cur.fetchone()
+        if row is None:
+            return None
+        return row['point'] if isinstance(row, dict) else row[0]
+
+    def get_balance(self, cur, owner_type: str, owner_id: int) -> int:
+        """
+        Returns the current balance, or 0 if the owner has no points row.
+
+        Args:
+            cur: Open database cursor
+            owner_type (str): 'user' or 'group'
+            owner_id (int): User or group id
+        """
+        if self.sharded:
+            run_query(cur, 'points_balance_sharded', (owner_type, owner_id))
+        else:
+            run_query(cur, 'points_balance', (owner_type, owner_id))
+        point = self._fetch_value(cur)
+        return int(point) if point is not None else 0
+
+    def credit(self, cur, owner_type: str, owner_id: int, amount: int):
+        """
+        Adds points to an owner.
+
+        Returns:
+            int: New balance in single-row mode; in sharded mode the value of the
+                 credited shard (the balance is not read back to keep the write
+                 path lock-free). None if the owner has no points row.
+        """
+        if self.sharded:
+            run_query(cur, 'points_credit_shard', (random.randrange(self.shards), amount, owner_type, owner_id))
+            row = cur.fetchone()
+            if row is None:
+                return None
+            return row['delta'] if isinstance(row, dict) else row[0]
+        run_query(cur, 'points_add', (amount, owner_type, owner_id))
+        return self._fetch_value(cur)
+
+    def debit(self, cur, owner_type: str, owner_id: int, amount: int):
+        """
+        Subtracts points from an owner.
+
+        Returns:
+            int: New balance, or None if the owner has no points row
+        """
+        if self.sharded:
+            self.compact_owner(cur, owner_type, owner_id)
+        run_query(cur, 'points_add', (-amount, owner_type, owner_id))
+        return self._fetch_value(cur)
+
+    def compact_owner(self, cur, owner_type: str, owner_id: int):
+        """Folds one owner's shards into its points row (never creates one)."""
+        run_query(cur, 'points_compact_owner', (owner_type, owner_id, owner_type, owner_id))
+
+    def compact(self, cur) -> int:
+        """
+        Folds all shards into their points rows.
+
+        Shards of owners without a points row are left alone rather than
+        creating one.
+
+        Returns:
+            int: Number of owners whose balance was compacted
+        """
+        cur.execute("""
+            WITH moved AS (
+                DELETE FROM point_shards s
+                USING points p
+                WHERE p.owner_type = s.owner_type AND p.owner_id = s.owner_id
+                RETURNING s.owner_type, s.owner_id, s.delta
+            ), sums AS (
+                SELECT owner_type, owner_id, SUM(delta) AS delta
+                FROM moved
+                GROUP BY owner_type, owner_id
+            )
+            UPDATE points p
+            SET point = p.point + sums.delta,
+                updated_at = now()
+            FROM sums
+            WHERE p.owner_type = sums.owner_type AND p.owner_id = sums.owner_id
+        """)
+        return cur.rowcount
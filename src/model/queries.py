@@ -0,0 +1,217 @@
+import os
+import re
+import weakref
+from psycopg2 import errors
+from dotenv import load_dotenv
+
+load_dotenv()
+
+_PLACEHOLDER = re.compile(r'%s')
+
+
+class NamedQuery:
+    """
+    One registered statement.
+
+    The SQL is written with psycopg2 %s placeholders like everywhere else;
+    they are numbered ($1, $2, ...) for PREPARE.
+    """
+
+    def __init__(self, name: str, sql: str, param_types: tuple = ()):
+        self.name = name
+        self.sql = sql
+        self.param_types = tuple(param_types)
+        counter = iter(range(1, len(self.param_types) + 1))
+        numbered = _PLACEHOLDER.sub(lambda _: f"${next(counter)}", sql)
+        types = f" ({', '.join(self.param_types)})" if self.param_types else ''
+        self.prepare_sql = f"PREPARE {name}{types} AS {numbered}"
+        args = f" ({', '.join(['%s'] * len(self.param_types))})" if self.param_types else ''
+        self.execute_sql = f"EXECUTE {name}{args}"
+
+
+class QueryRegistry:
+    """
+    Named hot-path queries, prepared once per database connection.
+
+    The first run of a query on a connection sends PREPARE with the declared
+    parameter types; later runs only send EXECUTE name(params), so Postgres
+    skips parsing and (after a few runs) planning. Prepared plans follow
+    search_path changes, so tenants with their own schema share them.
+    Set POSTGRES_PREPARED_STATEMENTS=0 behind a transaction-pooling proxy
+    (e.g. PgBouncer) to run the plain SQL instead.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(QueryRegistry, cls).__new__(cls)
+            cls._instance._initialize()
+        return cls._instance
+
+    def _initialize(self):
+        self.enabled = os.getenv('POSTGRES_PREPARED_STATEMENTS', '1') != '0'
+        self.queries = {}
+        # connection -> names prepared on it (reconnecting starts a new set)
+        self._prepared = weakref.WeakKeyDictionary()
+
+    def register(self, name: str, sql: str, param_types: tuple = ()):
+        """
+        Registers a query.
+
+        Args:
+            name (str): Statement name (a valid SQL identifier)
+            sql (str): SQL with one %s per parameter
+            param_types (tuple): Postgres type of each parameter, e.g. ('bigint', 'text')
+        """
+        query = NamedQuery(name, sql, param_types)
+        if len(_PLACEHOLDER.findall(sql)) != len(query.param_types):
+            raise ValueError(f"Query {name} has a different number of placeholders and parameter types")
+        self.queries[name] = query
+
+    def execute(self, cur, name: str, params: tuple = ()):
+        """
+        Runs a registered query on the cursor (fetch results from the cursor as usual).
+
+        Args:
+            cur: Open database cursor
+            name (str): Registered query name
+            params (tuple): Parameter values in placeholder order
+        """
+        query = self.queries[name]
+        if not self.enabled:
+            cur.execute(query.sql, params)
+            return
+        prepared = self._prepared.setdefault(cur.connection, set())
+        if name not in prepared:
+            cur.execute(query.prepare_sql)
+            prepared.add(name)
+        try:
+            cur.execute(query.execute_sql, params)
+        except errors.InvalidSqlStatementName:
+            # 세션의 prepared statement 가 사라진 경우 (예: DISCARD ALL) 다음 실행에서 다시 PREPARE
+            prepared.clear()
+            raise
+
+
+QUERIES = QueryRegistry()
+
+
+def run_query(cur, name: str, params: tuple = ()):
+    """Runs a query from the registry; see QueryRegistry.execute."""
+    QUERIES.execute(cur, name, params)
+
+
+# 현재 tenant 의 광고 집합 (ad_tag 가 NULL 이면 모든 광고); 파라미터는 (ad_tag, ad_tag)
+AD_TENANT_FILTER = "(%s::text IS NULL OR tenant IS NULL OR tenant = %s)"
+
+
+# 언어 조회 / 변경
+QUERIES.register('user_language', """
+    SELECT language FROM users WHERE user_id = %s
+""", ('bigint',))
+QUERIES.register('group_language', """
+    SELECT language FROM groups WHERE group_id = %s
+""", ('bigint',))
+QUERIES.register('set_user_language', """
+    UPDATE users SET language = %s WHERE user_id = %s
+""", ('text', 'bigint'))
+QUERIES.register('set_group_language', """
+    UPDATE groups SET language = %s WHERE group_id = %s
+""", ('text', 'bigint'))
+
+# 사용자 / 그룹 등록
+QUERIES.register('find_user', """
+    SELECT user_id, language FROM users WHERE user_id = %s
+""", ('bigint',))
+QUERIES.register('insert_user', """
+    INSERT INTO users (user_id, username, language)
+    VALUES (%s, %s, 'ko')
+""", ('bigint', 'text'))
+QUERIES.register('find_group', """
+    SELECT group_id, language FROM groups WHERE group_id = %s
+""", ('bigint',))
+QUERIES.register('insert_group', """
+    INSERT INTO groups (group_id, group_name, language)
+    VALUES (%s, %s, 'ko')
+""", ('bigint', 'text'))
+QUERIES.register('insert_points', """
+    INSERT INTO points (owner_type, owner_id, point)
+    VALUES (%s, %s, 0)
+""", ('text', 'bigint'))
+
+# 포인트
+QUERIES.register('points_balance', """
+    SELECT p.point
+    FROM points p
+    WHERE p.owner_type = %s AND p.owner_id = %s
+""", ('text', 'bigint'))
+QUERIES.register('points_add', """
+    UPDATE points
+    SET point = point + %s
+    WHERE owner_type = %s AND owner_id = %s
+    RETURNING point
+""", ('int', 'text', 'bigint'))
+
+# 포인트 (POINTS_SHARDS > 1, model/points.py 참고)
+QUERIES.register('points_balance_sharded', """
+    SELECT p.point + COALESCE((
+        SELECT SUM(s.delta)
+        FROM point_shards s
+        WHERE s.owner_type = p.owner_type AND s.owner_id = p.owner_id
+    ), 0) AS point
+    FROM points p
+    WHERE p.owner_type = %s AND p.owner_id = %s
+""", ('text', 'bigint'))
+QUERIES.register('points_credit_shard', """
+    INSERT INTO point_shards (owner_type, owner_id, shard, delta)
+    SELECT p.owner_type, p.owner_id, %s, %s
+    FROM points p
+    WHERE p.owner_type = %s AND p.owner_id = %s
+    ON CONFLICT (owner_type, owner_id, shard) DO UPDATE
+    SET delta = point_shards.delta + EXCLUDED.delta
+    RETURNING delta
+""", ('int', 'int', 'text', 'bigint'))
+QUERIES.register('points_compact_owner', """
+    WITH moved AS (
+        DELETE FROM point_shards s
+        USING points p
+        WHERE s.owner_type = %s AND s.owner_id = %s
+        AND p.owner_type = s.owner_type AND p.owner_id = s.owner_id
+        RETURNING s.delta
+    )
+    UPDATE points
+    SET point = point + (SELECT SUM(delta) FROM moved),
+        updated_at = now()
+    WHERE owner_type = %s AND owner_id = %s
+    AND EXISTS (SELECT 1 FROM moved)
+""", ('text', 'bigint', 'text', 'bigint'))
+
+# 광고 (ad_tag 가 NULL 이면 모든 광고)
+QUERIES.register('random_ad', f"""
+    SELECT id, content, url, points
+    FROM ads
+    WHERE is_active = TRUE
+    AND {AD_TENANT_FILTER}
+    AND (language IS NULL OR language = %s)
+    ORDER BY RANDOM() ^ (1.0 / weight) DESC
+    LIMIT 1
+""", ('text', 'text', 'text'))
+QUERIES.register('latest_ad', f"""
+    SELECT content, url
+    FROM ads
+    WHERE is_active = TRUE
+    AND {AD_TENANT_FILTER}
+    ORDER BY created_at DESC
+    LIMIT 1
+""", ('text', 'text'))
+QUERIES.register('viewed_ad_today', """
+    SELECT id
+    FROM ad_view_logs
+    WHERE owner_type = %s
+    AND owner_id = %s
+    AND DATE(viewed_at) = CURRENT_DATE
+""", ('text', 'bigint'))
+QUERIES.register('insert_ad_view_log', """
+    INSERT INTO ad_view_logs (owner_type, owner_id, ad_id, points_earned)
+    VALUES (%s, %s, %s, %s)
+""", ('text', 'bigint', 'bigint', 'int'))
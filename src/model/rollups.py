@@ -0,0 +1,108 @@
+import logging
+from psycopg2.extras import RealDictCursor
+from model.database import DatabaseConnection
+
+ROLLUP_NAME = 'ad_daily_stats'
+
+
+def update_ad_daily_stats() -> int:
+    """
+    Folds whole days of ad_view_logs into ad_daily_stats.
+
+    Days are folded once they are closed, i.e. before CURRENT_DATE - 1. The
+    extra day covers views dated yesterday that commit after midnight. The
+    last folded day is kept in rollup_state (day watermark) and moved in the
+    same transaction as the counters, so each day is folded exactly once.
+
+    Returns:
+        int: Number of log rows aggregated
+    """
+    db = DatabaseConnection()
+    with db.get_cursor() as cur:
+        # 동시 실행 방지를 위해 상태 행을 잠금
+        cur.execute("""
+            SELECT folded_through
+            FROM rollup_state
+            WHERE name = %s
+            FOR UPDATE
+        """, (ROLLUP_NAME,))
+        row = cur.fetchone()
+        folded_through = row[0] if row else None
+
+        cur.execute("SELECT CURRENT_DATE - 2")
+        fold_until = cur.fetchone()[0]
+        if folded_through is not None and folded_through >= fold_until:
+            return 0
+
+        cur.execute("""
+            WITH delta AS (
+                SELECT ad_id, viewed_at AS day, owner_type,
+                       COUNT(*) AS impressions, SUM(points_earned) AS points_awarded
+                FROM ad_view_logs
+                WHERE (%s::date IS NULL OR viewed_at > %s) AND viewed_at <= %s
+                GROUP BY ad_id, viewed_at, owner_type
+            ), upserted AS (
+                INSERT INTO ad_daily_stats (ad_id, day, owner_type, impressions, points_awarded)
+                SELECT ad_id, day, owner_type, impressions, points_awarded FROM delta
+                ON CONFLICT (ad_id, day, owner_type) DO UPDATE
+                SET impressions = EXCLUDED.impressions,
+                    points_awarded = EXCLUDED.points_awarded
+            )
+            SELECT COALESCE(SUM(impressions), 0) FROM delta
+        """, (folded_through, folded_through, fold_until))
+        aggregated = cur.fetchone()[0]
+
+        cur.execute("""
+            INSERT INTO rollup_state (name, folded_through, updated_at)
+            VALUES (%s, %s, now())
+            ON CONFLICT (name) DO UPDATE
+            SET folded_through = EXCLUDED.folded_through, updated_at = now()
+        """, (ROLLUP_NAME, fold_until))
+
+    logging.info(f"Rolled up {aggregated} ad views into {ROLLUP_NAME} (through {fold_until})")
+    return aggregated
+
+
+def get_ad_stats(days: int) -> list:
+    """
+    Per-ad totals for the last `days` days.
+
+    Folded days are read from ad_daily_stats; days after the watermark
+    (today, yesterday, or more if the rollup job is behind) are counted
+    live from ad_view_logs.
+
+    Args:
+        days (int): Number of days including today
+
+    Returns:
+        list: Rows with ad_id, user_impressions, group_impressions, impressions, points_awarded
+    """
+    def fetch(cur):
+        cur.execute("""
+            WITH state AS (
+                SELECT COALESCE(
+                    (SELECT folded_through FROM rollup_state WHERE name = %s),
+                    '-infinity'::date
+                ) AS folded_through
+            ), combined AS (
+                SELECT s.ad_id, s.owner_type, s.impressions, s.points_awarded
+                FROM ad_daily_stats s, state
+                WHERE s.day > CURRENT_DATE - %s AND s.day <= state.folded_through
+                UNION ALL
+                SELECT l.ad_id, l.owner_type, COUNT(*), SUM(l.points_earned)
+                FROM ad_view_logs l, state
+                WHERE l.viewed_at > CURRENT_DATE - %s AND l.viewed_at > state.folded_through
+                GROUP BY l.ad_id, l.owner_type
+            )
+            SELECT ad_id,
+                   SUM(impressions) FILTER (WHERE owner_type = 'user') AS user_impressions,
+                   SUM(impressions) FILTER (WHERE owner_type = 'group') AS group_impressions,
+                   SUM(impressions) AS impressions,
+                   SUM(points_awarded) AS points_awarded
+            FROM combined
+            GROUP BY ad_id
+            ORDER BY impressions DESC
+        """, (ROLLUP_NAME, days, days))
+        return cur.fetchall()
+
+    return DatabaseConnection().read(fetch, cursor_factory=RealDictCursor)
@@ -0,0 +1,219 @@
+import argparse
+import fcntl
+import logging
+import os
+import struct
+import tempfile
+import zlib
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+from dotenv import load_dotenv
+
+load_dotenv()
+
+_MAGIC = 0x56414C4C45590001  # "VALLEY" + layout version
+# header: magic, slot 수, generation
+_HEADER = struct.Struct('<qqq')
+# slot: seq (홀수 = 쓰는 중), key, namespace, generation << 32 | value
+_SLOT = struct.Struct('<qqqq')
+_MAX_PROBES = 8
+_EMPTY_KEY = 0
+
+LANGUAGE_CODES = {'ko': 1, 'en': 2}
+LANGUAGES_BY_CODE = {code: language for language, code in LANGUAGE_CODES.items()}
+
+
+def _namespace(name: str) -> int:
+    """Stable id of a key space (same in every process)."""
+    return zlib.crc32(name.encode('utf-8'))
+
+
+class SharedCache:
+    """
+    Host-local cache shared by the bot processes on one machine (SHARED_CACHE=1).
+
+    A fixed-size open-addressing table in multiprocessing.shared_memory maps
+    (namespace, int64 key) to a small int code, e.g. a chat's language.
+    Reads are lock-free: each slot carries a sequence number that writers make
+    odd while they write, and a reader that sees an odd or changed number
+    treats the lookup as a miss. Writers serialize on a file lock. Every slot
+    also stores the table generation it was written in; bumping the
+    generation invalidates all entries at once without touching them.
+
+    The segment outlives the processes (restarted workers find it warm); it
+    is removed with 'python -m model.shared_cache unlink'.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(SharedCache, cls).__new__(cls)
+            cls._instance._initialize()
+        return cls._instance
+
+    def _initialize(self):
+        self.enabled = os.getenv('SHARED_CACHE', '0') == '1'
+        self.name = os.getenv('SHARED_CACHE_NAME', 'valley_cache')
+        # 2의 거듭제곱으로 맞춤 (slot 당 32 bytes)
+        slots = max(int(os.getenv('SHARED_CACHE_SLOTS', '262144')), _MAX_PROBES)
+        self.slots = 1 << (slots - 1).bit_length()
+        self.shm = None
+        self._lock_file = None
+        if self.enabled:
+            try:
+                self._attach()
+            except Exception as e:
+                logging.error(f"Shared cache disabled: {e}")
+                self.enabled = False
+
+    def _attach(self):
+        size = _HEADER.size + self.slots * _SLOT.size
+        lock_path = os.path.join(tempfile.gettempdir(), f"{self.name}.lock")
+        self._lock_file = open(lock_path, 'a+')
+        with self._write_lock():
+            try:
+                self.shm = shared_memory.SharedMemory(name=self.name, create=True, size=size)
+                # 새 segment 는 0으로 채워져 있음 (모든 slot 비어 있음)
+                _HEADER.pack_into(self.shm.buf, 0, _MAGIC, self.slots, 1)
+                logging.info(f"Created shared cache {self.name} ({self.slots} slots, {size / 1024 / 1024:.1f} MiB)")
+            except FileExistsError:
+                self.shm = shared_memory.SharedMemory(name=self.name)
+                magic, slots, _ = _HEADER.unpack_from(self.shm.buf, 0)
+                if magic != _MAGIC or slots != self.slots:
+                    self.shm.close()
+                    self.shm = None
+                    raise RuntimeError(
+                        f"{self.name} has a different layout; unlink it or change SHARED_CACHE_NAME"
+                    )
+                logging.info(f"Attached to shared cache {self.name}")
+        # resource_tracker 가 프로세스 종료 시 segment 를 지우지 않도록 (다른 프로세스가 사용 중)
+        resource_tracker.unregister(self.shm._name, 'shared_memory')
+
+    @contextmanager
+    def _write_lock(self):
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    @property
+    def generation(self) -> int:
+        return _HEADER.unpack_from(self.shm.buf, 0)[2]
+
+    def _probe(self, namespace: int, key: int):
+        """Slot offsets of the key's probe window."""
+        start = ((key * 0x9E3779B97F4A7C15) ^ namespace) & (self.slots - 1)
+        for i in range(_MAX_PROBES):
+            yield _HEADER.size + ((start + i) & (self.slots - 1)) * _SLOT.size
+
+    def get(self, name: str, key: int):
+        """
+        Looks up a code without locking.
+
+        Args:
+            name (str): Key space, e.g. 'language:user' (include the tenant prefix)
+            key (int): int64 key, e.g. a chat id
+
+        Returns:
+            int: Stored code, or None on a miss
+        """
+        namespace = _namespace(name)
+        generation = self.generation
+        buf = self.shm.buf
+        for offset in self._probe(namespace, key):
+            seq, slot_key, slot_namespace, packed = _SLOT.unpack_from(buf, offset)
+            if slot_key == _EMPTY_KEY:
+                return None
+            if slot_key != key or slot_namespace != namespace:
+                continue
+            # 쓰는 중이었거나 읽는 동안 바뀐 slot 은 miss 로 처리
+            if seq & 1 or _SLOT.unpack_from(buf, offset)[0] != seq:
+                return None
+            if packed >> 32 != generation:
+                return None
+            return packed & 0xFFFFFFFF
+        return None
+
+    def set(self, name: str, key: int, value: int):
+        """
+        Stores a code in the key's slot, a free or outdated one, or else the first of its window.
+
+        Args:
+            name (str): Key space
+            key (int): int64 key other than 0
+            value (int): Code between 0 and 2**32 - 1
+        """
+        namespace = _namespace(name)
+        buf = self.shm.buf
+        with self._write_lock():
+            generation = self.generation
+            target = None
+            for offset in self._probe(namespace, key):
+                _, slot_key, slot_namespace, packed = _SLOT.unpack_from(buf, offset)
+                if slot_key == key and slot_namespace == namespace:
+                    target = offset
+                    break
+                if target is None and (slot_key == _EMPTY_KEY or packed >> 32 != generation):
+                    target = offset
+            if target is None:
+                target = next(self._probe(namespace, key))
+            seq = _SLOT.unpack_from(buf, target)[0]
+            struct.pack_into('<q', buf, target, seq + 1)
+            _SLOT.pack_into(buf, target, seq + 1, key, namespace, (generation << 32) | value)
+            struct.pack_into('<q', buf, target, seq + 2)
+
+    def invalidate(self):
+        """Drops every entry at once by moving to a new generation."""
+        with self._write_lock():
+            magic, slots, generation = _HEADER.unpack_from(self.shm.buf, 0)
+            _HEADER.pack_into(self.shm.buf, 0, magic, slots, generation % 0x7FFFFFFF + 1)
+
+    def stats(self) -> dict:
+        """Number of slots and of entries valid in the current generation."""
+        generation = self.generation
+        used = 0
+        for i in range(self.slots):
+            _, slot_key, _, packed = _SLOT.unpack_from(self.shm.buf, _HEADER.size + i * _SLOT.size)
+            if slot_key != _EMPTY_KEY and packed >> 32 == generation:
+                used += 1
+        return {'slots': self.slots, 'entries': used, 'generation': generation}
+
+    def close(self):
+        if self.shm is not None:
+            self.shm.close()
+            self.shm = None
+
+
+def main():
+    """
+    Command line entry point (run from src/):
+
+        python -m model.shared_cache stats
+        python -m model.shared_cache invalidate
+        python -m model.shared_cache unlink
+    """
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Inspect or reset the host-local shared cache")
+    parser.add_argument('command', choices=('stats', 'invalidate', 'unlink'))
+    args = parser.parse_args()
+
+    os.environ['SHARED_CACHE'] = '1'
+    cache = SharedCache()
+    if not cache.enabled:
+        return
+    if args.command == 'stats':
+        print(cache.stats())
+    elif args.command == 'invalidate':
+        cache.invalidate()
+        print(f"Shared cache generation is now {cache.generation}")
+    else:
+        # _attach 에서 해제한 resource_tracker 등록을 되돌려야 unlink 가 정상 동작
+        resource_tracker.register(cache.shm._name, 'shared_memory')
+        cache.shm.unlink()
+        cache.close()
+        print(f"Removed shared cache {cache.name}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+import contextvars
+import logging
+import os
+import re
+from contextlib import contextmanager
+from dotenv import load_dotenv
+
+load_dotenv()
+
+_SCHEMA_PATTERN = re.compile(r'^[a-z_][a-z0-9_]*$')
+
+
+class Tenant:
+    """
+    One branded bot served by this process.
+
+    A tenant either has its own schema (separate users/points/ads/... tables
+    under the same database) or shares the default tables and only narrows the
+    ads it shows with ad_tag (ads.tenant column).
+    """
+
+    def __init__(self, name: str, token: str, schema: str = None, ad_tag: str = None):
+        if schema and not _SCHEMA_PATTERN.match(schema):
+            raise ValueError(f"Invalid schema name for tenant {name}: {schema}")
+        self.name = name
+        self.token = token
+        self.schema = schema
+        self.ad_tag = ad_tag
+
+    @property
+    def search_path(self) -> str:
+        return f"{self.schema}, public" if self.schema else None
+
+    @property
+    def cache_prefix(self) -> str:
+        """Prefix for cache keys; tenants with their own tables get their own entries."""
+        return f"{self.schema}:" if self.schema else ''
+
+    def __repr__(self):
+        return f"Tenant({self.name})"
+
+
+def load_tenants() -> list:
+    """
+    Reads the tenants from the environment.
+
+    BOT_TENANTS lists tenant names; each one is configured with
+    TENANT_<NAME>_TOKEN, optional TENANT_<NAME>_SCHEMA and TENANT_<NAME>_AD_TAG.
+    Without BOT_TENANTS a single 'default' tenant uses TELEGRAM_BOT_TOKEN.
+
+    Returns:
+        list: Tenant objects
+    """
+    names = [name.strip() for name in os.getenv('BOT_TENANTS', '').split(',') if name.strip()]
+    if not names:
+        return [Tenant('default', os.getenv('TELEGRAM_BOT_TOKEN'))]
+
+    tenants = []
+    for name in names:
+        prefix = f"TENANT_{name.upper()}_"
+        token = os.getenv(prefix + 'TOKEN')
+        if not token:
+            logging.error(f"Tenant {name} has no {prefix}TOKEN, skipping")
+            continue
+        tenants.append(Tenant(
+            name,
+            token,
+            schema=os.getenv(prefix + 'SCHEMA') or None,
+            ad_tag=os.getenv(prefix + 'AD_TAG') or None
+        ))
+    return tenants
+
+
+TENANTS = load_tenants()
+DEFAULT_TENANT = TENANTS[0] if TENANTS else Tenant('default', None)
+
+_current_tenant = contextvars.ContextVar('current_tenant', default=None)
+
+
+def current_tenant() -> Tenant:
+    """Tenant of the update being handled, or the first configured tenant."""
+    return _current_tenant.get() or DEFAULT_TENANT
+
+
+def set_current_tenant(tenant: Tenant):
+    """Sets the tenant for the rest of the current context (used per update)."""
+    _current_tenant.set(tenant)
+
+
+@contextmanager
+def use_tenant(tenant: Tenant):
+    """
+    Runs a block on behalf of a tenant (e.g. a scheduled job).
+
+    Args:
+        tenant (Tenant): The tenant
+    """
+    token = _current_tenant.set(tenant)
+    try:
+        yield tenant
+    finally:
+        _current_tenant.reset(token)
@@ -0,0 +1,80 @@
+import asyncio
+import logging
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class Readiness:
+    """
+    Process readiness flag.
+
+    The bot is live as soon as it runs and ready once the startup warm-up
+    has finished, so a rolling restart can wait before shifting traffic.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(Readiness, cls).__new__(cls)
+            cls._instance._initialize()
+        return cls._instance
+
+    def _initialize(self):
+        self.ready = False
+        self.details = {}
+
+    def mark_ready(self, **details):
+        self.ready = True
+        self.details = details
+
+    def mark_not_ready(self):
+        self.ready = False
+
+
+class HealthServer:
+    """
+    Minimal HTTP endpoint for orchestrator probes (HEALTH_PORT, 0 disables).
+
+    GET /live  -> 200 while the process runs
+    GET /ready -> 200 once warm-up finished, 503 before
+    """
+
+    def __init__(self, port: int = None):
+        self.port = int(os.getenv('HEALTH_PORT', '0')) if port is None else port
+        self.server = None
+
+    async def start(self):
+        if not self.port:
+            return
+        self.server = await asyncio.start_server(self._handle, host='0.0.0.0', port=self.port)
+        logging.info(f"Health endpoint listening on port {self.port}")
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            parts = request_line.decode('latin-1').split()
+            path = parts[1] if len(parts) > 1 else '/'
+            if path == '/live':
+                status, body = '200 OK', 'live'
+            elif path == '/ready':
+                ready = Readiness().ready
+                status, body = ('200 OK', 'ready') if ready else ('503 Service Unavailable', 'warming up')
+            else:
+                status, body = '404 Not Found', 'not found'
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: text/plain\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n{body}".encode()
+            )
+            await writer.drain()
+        except Exception as e:
+            logging.error(f"Error in health endpoint: {e}")
+        finally:
+            writer.close()
@@ -0,0 +1,153 @@
+import gc
+import logging
+import os
+import sys
+import tracemalloc
+from collections import Counter
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def deep_sizeof(obj, seen: set = None) -> int:
+    """
+    Approximate size in bytes of an object and the containers it holds.
+
+    Args:
+        obj: Object to measure
+        seen (set): ids already counted (shared objects are counted once)
+
+    Returns:
+        int: Size in bytes
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    # 작업 스레드가 캐시를 바꾸는 중일 수 있으므로 복사본을 순회
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in list(obj.items()))
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in list(obj))
+    return size
+
+
+def rss_bytes() -> int:
+    """Current resident set size of the process, or None if unavailable."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class MemoryDiagnostics:
+    """
+    Opt-in memory accounting (MEMORY_DIAGNOSTICS=1).
+
+    Starts tracemalloc at startup, reports entry counts and sizes of the bot's
+    own caches, and lists top allocation sites, optionally as a diff against
+    the first snapshot so steady growth stands out.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(MemoryDiagnostics, cls).__new__(cls)
+            cls._instance._initialize()
+        return cls._instance
+
+    def _initialize(self):
+        self.enabled = os.getenv('MEMORY_DIAGNOSTICS', '0') == '1'
+        self.frames = int(os.getenv('MEMORY_TRACE_FRAMES', '5'))
+        self.top_n = int(os.getenv('MEMORY_TOP_N', '10'))
+        # name -> callable returning the cache object
+        self.caches = {}
+        self.baseline = None
+
+    def start(self):
+        """Starts tracemalloc if diagnostics are enabled."""
+        if self.enabled and not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self.baseline = tracemalloc.take_snapshot()
+            logging.info(f"tracemalloc started ({self.frames} frames)")
+
+    def register_cache(self, name: str, getter):
+        """
+        Registers a cache to include in reports.
+
+        Args:
+            name (str): Name shown in reports
+            getter: Callable returning the current cache object
+        """
+        self.caches[name] = getter
+
+    def cache_report(self) -> list:
+        """
+        Entry counts and approximate sizes of the registered caches.
+
+        Returns:
+            list: (name, entries, bytes) tuples, largest first
+        """
+        report = []
+        for name, getter in self.caches.items():
+            try:
+                cache = getter()
+                entries = len(cache) if hasattr(cache, '__len__') else None
+                report.append((name, entries, deep_sizeof(cache)))
+            except Exception as e:
+                logging.error(f"Error measuring cache {name}: {e}")
+        return sorted(report, key=lambda item: item[2], reverse=True)
+
+    def top_allocations(self, diff: bool = False) -> list:
+        """
+        Top allocation sites from a fresh tracemalloc snapshot.
+
+        Args:
+            diff (bool): Compare against the startup snapshot instead of absolute sizes
+
+        Returns:
+            list: Formatted lines, empty when tracemalloc is not running
+        """
+        if not tracemalloc.is_tracing():
+            return []
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+        if diff and self.baseline is not None:
+            stats = snapshot.compare_to(self.baseline, 'lineno')[:self.top_n]
+            return [
+                f"{stat.traceback[0]}: {stat.size / 1024:.1f} KiB ({stat.size_diff / 1024:+.1f} KiB), {stat.count} blocks"
+                for stat in stats
+            ]
+        stats = snapshot.statistics('lineno')[:self.top_n]
+        return [f"{stat.traceback[0]}: {stat.size / 1024:.1f} KiB, {stat.count} blocks" for stat in stats]
+
+    def object_counts(self, limit: int = 10) -> list:
+        """Most common live object types tracked by the garbage collector."""
+        counts = Counter(type(obj).__name__ for obj in gc.get_objects())
+        return counts.most_common(limit)
+
+    def report_lines(self, diff: bool = True) -> list:
+        """Full report as text lines (RSS, caches, object types, allocation sites)."""
+        lines = []
+        rss = rss_bytes()
+        if rss is not None:
+            lines.append(f"RSS: {rss / 1024 / 1024:.1f} MiB")
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            lines.append(f"Traced: {current / 1024 / 1024:.1f} MiB (peak {peak / 1024 / 1024:.1f} MiB)")
+        for name, entries, size in self.cache_report():
+            lines.append(f"cache {name}: {entries} entries, {size / 1024:.1f} KiB")
+        for type_name, count in self.object_counts():
+            lines.append(f"objects {type_name}: {count}")
+        lines.extend(self.top_allocations(diff=diff))
+        return lines
+
+    def log_report(self):
+        """Logs the report; used by the periodic memory_report job."""
+        for line in self.report_lines():
+            logging.info(f"memory {line}")
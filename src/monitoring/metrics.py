@@ -0,0 +1,63 @@
+import logging
+import threading
+
+
+class Metrics:
+    """
+    In-process counters and timings.
+
+    Names are plain strings; labels are folded into the name
+    (e.g. "job.refresh_ads.duration_ms") so snapshots stay flat.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(Metrics, cls).__new__(cls)
+            cls._instance._initialize()
+        return cls._instance
+
+    def _initialize(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.timings = {}
+
+    def incr(self, name: str, value: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, ms: float):
+        """
+        Records a duration in milliseconds.
+
+        Args:
+            name (str): Timing name
+            ms (float): Duration in milliseconds
+        """
+        with self._lock:
+            timing = self.timings.get(name)
+            if timing is None:
+                timing = {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'last_ms': 0.0}
+                self.timings[name] = timing
+            timing['count'] += 1
+            timing['total_ms'] += ms
+            timing['last_ms'] = ms
+            timing['max_ms'] = max(timing['max_ms'], ms)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                'counters': dict(self.counters),
+                'timings': {name: dict(timing) for name, timing in self.timings.items()},
+            }
+
+    def log_snapshot(self):
+        snapshot = self.snapshot()
+        for name, value in sorted(snapshot['counters'].items()):
+            logging.info(f"metric {name}={value}")
+        for name, timing in sorted(snapshot['timings'].items()):
+            avg = timing['total_ms'] / timing['count'] if timing['count'] else 0
+            logging.info(
+                f"metric {name} count={timing['count']} avg_ms={avg:.1f} "
+                f"max_ms={timing['max_ms']:.1f} last_ms={timing['last_ms']:.1f}"
+            )
@@ -0,0 +1,231 @@
+import contextvars
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from functools import wraps
+from telegram.request import HTTPXRequest
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 현재 처리 중인 update의 trace와 span
+_current_trace = contextvars.ContextVar('current_trace', default=None)
+_current_span = contextvars.ContextVar('current_span', default=None)
+
+
+class Span:
+    """A single timed operation inside a trace."""
+
+    def __init__(self, trace_id: str, parent_id: str, name: str, attributes: dict):
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start = time.time()
+        self._start_perf = time.perf_counter()
+        self.duration_ms = None
+        self.error = None
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def finish(self):
+        self.duration_ms = round((time.perf_counter() - self._start_perf) * 1000, 3)
+
+    def to_dict(self) -> dict:
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start': self.start,
+            'duration_ms': self.duration_ms,
+            'error': self.error,
+            'attributes': self.attributes,
+        }
+
+
+class Trace:
+    """Collects the spans of one update until the root span finishes."""
+
+    def __init__(self, sampled: bool):
+        self.trace_id = uuid.uuid4().hex
+        self.sampled = sampled
+        self.spans = []
+
+
+class FileExporter:
+    """Appends finished traces to a local file, one JSON span per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: list):
+        lines = ''.join(json.dumps(span.to_dict(), ensure_ascii=False, default=str) + '\n' for span in spans)
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+
+
+class LogExporter:
+    """Writes finished traces to the application log (collector stand-in)."""
+
+    def export(self, spans: list):
+        for span in spans:
+            logging.getLogger('trace').info(json.dumps(span.to_dict(), ensure_ascii=False, default=str))
+
+
+class Tracer:
+    """
+    Lightweight per-update tracer.
+
+    Every traced update gets a trace id and a root span; database statements,
+    cache lookups and Bot API calls made while handling it are recorded as
+    child spans. A trace is exported when it was head-sampled
+    (TRACE_SAMPLE_RATE) or when its root span took longer than TRACE_SLOW_MS,
+    so single slow requests are always kept.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(Tracer, cls).__new__(cls)
+            cls._instance._initialize()
+        return cls._instance
+
+    def _initialize(self):
+        self.sample_rate = float(os.getenv('TRACE_SAMPLE_RATE', '0'))
+        self.slow_ms = float(os.getenv('TRACE_SLOW_MS', '0'))
+        exporter = os.getenv('TRACE_EXPORTER', 'file')
+        if exporter == 'log':
+            self.exporter = LogExporter()
+        else:
+            self.exporter = FileExporter(os.getenv('TRACE_FILE', 'traces.jsonl'))
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0 or self.slow_ms > 0
+
+    @property
+    def active(self) -> bool:
+        """True while an update is being traced in the current context."""
+        return _current_trace.get() is not None
+
+    @contextmanager
+    def start_trace(self, name: str, **attributes):
+        """
+        Starts a new trace with a root span, or a child span if a trace is already active.
+
+        Args:
+            name (str): Name of the root span
+            **attributes: Extra attributes recorded on the root span
+        """
+        if not self.enabled or _current_trace.get() is not None:
+            with self.span(name, **attributes) as span:
+                yield span
+            return
+
+        trace = Trace(sampled=random.random() < self.sample_rate)
+        trace_token = _current_trace.set(trace)
+        try:
+            with self.span(name, **attributes) as root:
+                yield root
+        finally:
+            _current_trace.reset(trace_token)
+            if trace.sampled or (self.slow_ms > 0 and root.duration_ms >= self.slow_ms):
+                try:
+                    self.exporter.export(trace.spans)
+                except Exception as e:
+                    logging.error(f"Error exporting trace {trace.trace_id}: {e}")
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """
+        Records a child span of the current trace. Yields None if no trace is active.
+
+        Args:
+            name (str): Name of the span
+            **attributes: Extra attributes recorded on the span
+        """
+        trace = _current_trace.get()
+        if trace is None:
+            yield None
+            return
+
+        parent = _current_span.get()
+        span = Span(trace.trace_id, parent.span_id if parent else None, name, attributes)
+        span_token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = repr(e)
+            raise
+        finally:
+            span.finish()
+            _current_span.reset(span_token)
+            trace.spans.append(span)
+
+
+def traced(func):
+    """
+    Decorator for handler coroutines: opens a trace for the incoming update.
+
+    Nested handlers (e.g. actions dispatched by menu_callback) become child spans.
+    """
+    @wraps(func)
+    async def wrapper(self, update, context, *args, **kwargs):
+        tracer = Tracer()
+        if not tracer.enabled:
+            return await func(self, update, context, *args, **kwargs)
+
+        chat = getattr(update, 'effective_chat', None)
+        with tracer.start_trace(
+            f"handler.{func.__name__}",
+            update_id=getattr(update, 'update_id', None),
+            chat_id=chat.id if chat else None,
+        ):
+            return await func(self, update, context, *args, **kwargs)
+    return wrapper
+
+
+class TracedCursorMixin:
+    """Cursor mixin that records each executed statement as a span."""
+
+    def execute(self, query, vars=None):
+        with Tracer().span('db.execute', statement=' '.join(str(query).split())[:200]):
+            return super().execute(query, vars)
+
+
+_traced_cursor_classes = {}
+
+
+def traced_cursor_factory(base):
+    """
+    Returns a cursor class that traces statements on top of the given cursor class.
+
+    Args:
+        base: psycopg2 cursor class to extend
+
+    Returns:
+        type: Cached subclass of base with TracedCursorMixin applied
+    """
+    cls = _traced_cursor_classes.get(base)
+    if cls is None:
+        cls = type(f"Traced{base.__name__}", (TracedCursorMixin, base), {})
+        _traced_cursor_classes[base] = cls
+    return cls
+
+
+class TracingRequest(HTTPXRequest):
+    """HTTPXRequest that records every Bot API call as a span."""
+
+    async def do_request(self, url: str, method: str, *args, **kwargs):
+        with Tracer().span(f"telegram.{url.rsplit('/', 1)[-1]}", http_method=method):
+            return await super().do_request(url, method, *args, **kwargs)